@@ -0,0 +1,245 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import tempfile
+import threading
+
+from flask import abort, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# The number of seconds for which browsers may cache an asset requested through its fingerprinted
+# URL. Since the URL changes whenever the asset does, this can be as long as allowed (one year):
+IMMUTABLE_MAX_AGE = 31536000
+
+# The encodings in which bundles may be precompressed, in order of preference, along with the
+# extension of the file containing each compressed variant:
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# The functions used to compress bundles with each encoding that is available (brotli is only used
+# if the brotli package is installed):
+COMPRESSORS = {"gzip": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda data: brotli.compress(data, quality=11)
+
+
+def minify_css(text):
+    """
+    Minify the given stylesheet by removing its comments, indentation and blank lines.
+    """
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+def minify_js(text):
+    """
+    Conservatively minify the given script by removing its indentation, blank lines and lines that
+    only contain a // comment. Lines are never joined, so that automatic semicolon insertion is not
+    affected. A script that might contain a string spanning several lines (a template literal, or a
+    line continued with a backslash) is returned unchanged, since its lines cannot be safely altered
+    without parsing it.
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line and not line.startswith("//")]
+    for line in lines:
+        if line.endswith("\\") or re.sub(r"'`'|\"`\"", "", line).count("`") % 2:
+            return text
+    return "\n".join(lines) + "\n"
+
+
+def write_atomically(path, data):
+    """
+    Write the given bytes to the file at the given path, replacing it all at once so that it is
+    never seen partially written (e.g. by another instance of the editor that is starting up).
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class Assets:
+    """
+    The editor's static assets (its own scripts and stylesheets, and third party libraries), which
+    are referred to in templates by fingerprinted URLs of the form /assets/<digest>/<path>, where
+    the digest is a hash of the asset's contents. Because the URL of an asset changes whenever its
+    contents do, browsers can cache assets requested this way indefinitely. Only the given files,
+    and the files within the given directories, relative to the root directory, are served.
+
+    Assets may also be combined into bundles, given as a dictionary from the name of each bundle to
+    the paths of the files (relative to the root directory) that it concatenates, so that a page
+    can load them all in one request. Bundles are written to the build directory by build(), along
+    with precompressed variants that are served to browsers that accept them.
+    """
+
+    def __init__(self, root, files=(), dirs=(), bundles=None, build_dir=None):
+        self.root = root
+        self.files = set(files)
+        self.dirs = [d.rstrip("/") + "/" for d in dirs]
+        self.bundles = dict(bundles or {})
+        self.build_dir = build_dir
+        # The digest of each asset, along with the modification time and size it was computed for:
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def locate(self, path):
+        """
+        Return the location in the filesystem of the asset at the given path, or None if there is
+        no such asset (or it is not to be served).
+        """
+        path = posixpath.normpath(path)
+        if path in self.bundles:
+            location = os.path.join(self.build_dir, path)
+        elif path.startswith("../") or path.startswith("/"):
+            return None
+        elif path in self.files or any(path.startswith(d) for d in self.dirs):
+            location = os.path.join(self.root, path)
+        else:
+            return None
+        return location if os.path.isfile(location) else None
+
+    def is_asset(self, path):
+        return self.locate(path) is not None
+
+    def digest(self, path):
+        """
+        Return the digest of the contents of the asset at the given path, recomputing it only if the
+        asset has been modified since it was last computed.
+        """
+        location = self.locate(path)
+        stat = os.stat(location)
+        cached = self._digests.get(location)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        with open(location, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        with self._lock:
+            self._digests[location] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def bundle(self, name):
+        """
+        Return the contents of the given bundle: the minified contents of each of its files, in
+        order, each preceded by a comment naming the file.
+        """
+        is_css = name.endswith(".css")
+        parts = []
+        for path in self.bundles[name]:
+            with open(os.path.join(self.root, path), encoding="utf-8") as f:
+                text = f.read()
+            parts.append(f"/* {path} */\n" + (minify_css(text) if is_css else minify_js(text)))
+        # Separate scripts with a semicolon in case one of them does not end its last statement:
+        return ("" if is_css else ";\n").join(parts).encode("utf-8")
+
+    def build(self):
+        """
+        Write every bundle whose contents have changed to the build directory, along with a variant
+        compressed with each of the available COMPRESSORS. Returns the names of the bundles that
+        were written.
+        """
+        os.makedirs(self.build_dir, exist_ok=True)
+        built = []
+        for name in self.bundles:
+            location = os.path.join(self.build_dir, name)
+            content = self.bundle(name)
+            try:
+                with open(location, "rb") as f:
+                    changed = f.read() != content
+            except FileNotFoundError:
+                changed = True
+            if changed:
+                write_atomically(location, content)
+                built.append(name)
+            for encoding, extension in ENCODINGS:
+                if encoding in COMPRESSORS and (
+                    changed or not os.path.isfile(location + extension)
+                ):
+                    write_atomically(location + extension, COMPRESSORS[encoding](content))
+            if changed:
+                logger.info(f"Built {name} ({len(content)} bytes) in {self.build_dir}")
+        return built
+
+    def variant(self, location):
+        """
+        Return the encoding and location of the precompressed variant of the asset at the given
+        location that is preferred by the current request, or None if the request does not accept
+        any of the asset's variants. Variants older than the asset itself are ignored, since they
+        may have been compressed from a previous version of it.
+        """
+        modified = os.stat(location).st_mtime_ns
+        for encoding, extension in ENCODINGS:
+            if request.accept_encodings.quality(encoding) <= 0:
+                continue
+            try:
+                if os.stat(location + extension).st_mtime_ns >= modified:
+                    return encoding, location + extension
+            except FileNotFoundError:
+                pass
+        return None
+
+    def url(self, path):
+        """
+        Return the fingerprinted URL of the asset at the given path. This is made available to
+        templates as asset_url().
+        """
+        path = path.lstrip("/")
+        if not self.is_asset(path):
+            raise ValueError(f"Unknown asset: {path}")
+        return f"/assets/{self.digest(path)}/{path}"
+
+    def send(self, path, digest=None):
+        """
+        Return a response containing the asset at the given path, which is requested using the given
+        digest, if any. The response has the asset's digest as its ETag, so that conditional
+        requests for it are answered with 304 Not Modified. If the given digest is the asset's
+        current digest, the response may be cached forever; otherwise (e.g. for an unfingerprinted
+        URL, or a page rendered before the asset changed) it must be revalidated before reuse.
+
+        Bundles are sent compressed, if the request accepts one of their precompressed variants, in
+        which case the ETag also identifies the encoding.
+        """
+        location = self.locate(path)
+        if location is None:
+            abort(404)
+        current = self.digest(path)
+        variant = self.variant(location) if posixpath.normpath(path) in self.bundles else None
+        if variant is None:
+            directory, filename = os.path.split(location)
+            response = send_from_directory(directory, filename, etag=current, max_age=0)
+        else:
+            encoding, variant_location = variant
+            directory, filename = os.path.split(variant_location)
+            response = send_from_directory(
+                directory,
+                filename,
+                etag=f"{current}-{encoding}",
+                max_age=0,
+                mimetype=mimetypes.guess_type(location)[0],
+            )
+            response.content_encoding = encoding
+        if posixpath.normpath(path) in self.bundles:
+            response.vary.add("Accept-Encoding")
+        if digest == current:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
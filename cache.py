@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded cache which evicts the least recently used entry once it holds
+    max_entries entries. If a ttl (in seconds) is given, entries older than that are treated as
+    absent. The cache keeps count of hits, misses and evictions so that its effectiveness can be
+    monitored.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        """
+        Return the live (value, stored_at) pair for the given key, or None. Must be called with the
+        lock held.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl is not None and time.monotonic() - entry[1] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key, default=None):
+        """
+        Return the value cached under the given key, or the given default, counting the lookup as
+        a hit or a miss.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key, default=None):
+        """
+        Return the value cached under the given key, or the given default, without counting the
+        lookup as a hit or a miss.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            return default if entry is None else entry[0]
+
+    def set(self, key, value):
+        """
+        Cache the given value under the given key, evicting the least recently used entries if the
+        cache is full.
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """
+        Remove the entry for the given key from the cache and return its value.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def invalidate(self, predicate):
+        """
+        Remove every entry whose key satisfies the given predicate and return the number of
+        entries removed.
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return a dictionary summarising the current state of the cache.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class StaleWhileRevalidateCache:
+    """
+    A thread-safe cache of values produced by loader functions. A cached value is fresh for `ttl`
+    seconds, during which it is served as is. After that it is stale: for up to `max_stale` seconds
+    more it is still served immediately, but a background thread reloads it so that later requests
+    get a fresh value. Values that are absent, or older than `ttl + max_stale`, are loaded in the
+    calling thread. A value can also be tagged with a version, in which case a cached value having a
+    different version is treated as stale.
+    """
+
+    def __init__(self, ttl, max_stale, max_entries=64):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.entries = LRUCache(max_entries)
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        # Incremented on every invalidation, so that background reloads which started before an
+        # invalidation do not put the (possibly outdated) values they loaded back in the cache:
+        self._generation = 0
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader, version=None):
+        """
+        Return the value cached under the given key, calling the given loader (which takes no
+        arguments) to load it, either synchronously or in the background, as needed.
+        """
+        entry = self.entries.peek(key)
+        if entry is not None:
+            value, entry_version, loaded_at = entry
+            age = time.monotonic() - loaded_at
+            if age <= self.ttl and entry_version == version:
+                with self._lock:
+                    self.fresh_hits += 1
+                return value
+            if age <= self.ttl + self.max_stale:
+                with self._lock:
+                    self.stale_hits += 1
+                self.revalidate(key, loader, version)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        value = loader()
+        self.entries.set(key, (value, version, time.monotonic()))
+        return value
+
+    def revalidate(self, key, loader, version=None):
+        """
+        Reload the value for the given key in a background thread, unless that is already
+        happening.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            generation = self._generation
+
+        def reload():
+            try:
+                value = loader()
+                with self._lock:
+                    if generation == self._generation:
+                        self.entries.set(key, (value, version, time.monotonic()))
+            except Exception as e:
+                with self._lock:
+                    self.refresh_errors += 1
+                logger.error(f"Could not refresh cached value for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=reload, name=f"revalidate-{key}", daemon=True).start()
+
+    def invalidate(self, predicate):
+        """
+        Remove every value whose key satisfies the given predicate and return the number of values
+        removed.
+        """
+        with self._lock:
+            self._generation += 1
+        return self.entries.invalidate(predicate)
+
+    def stats(self):
+        """
+        Return a dictionary summarising the current state of the cache.
+        """
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.entries.max_entries,
+                "fresh_hits": self.fresh_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refresh_errors": self.refresh_errors,
+            }
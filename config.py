@@ -14,6 +14,13 @@ FLASK_HOST = os.getenv("FLASK_HOST")
 # The filesystem directory where the metadata editor is running from:
 PWD = os.path.dirname(os.path.realpath(__file__))
 
+# The locations of GitHub's web site (from which raw files are retrieved), REST API and OAuth API.
+# These only need to be changed in order to run the editor against a stand-in for GitHub, such as
+# tools/fake_github.py:
+GITHUB_URL = os.getenv("GITHUB_URL", "https://github.com")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_OAUTH_URL = os.getenv("GITHUB_OAUTH_URL", f"{GITHUB_URL}/login/oauth")
+
 # The github organisation/username to use when communicating with github (e.g. 'OBOFoundry')
 GITHUB_ORG = "OBOFoundry"
 # The github repository to use for editing PURL configuration (e.g. 'purl.obolibrary.org')
@@ -37,31 +44,138 @@ REGISTRY_REQUEST = (
 
 # The location of the PURL validation schema:
 PURL_SCHEMA = (
-    f"https://github.com/{GITHUB_ORG}/{GITHUB_PURL_REPO}/raw/"
+    f"{GITHUB_URL}/{GITHUB_ORG}/{GITHUB_PURL_REPO}/raw/"
     f"master/tools/config.schema.json"
 )
 # The location of the REGISTRY validations schema
 REGISTRY_SCHEMA = (
-    f"https://github.com/{GITHUB_ORG}/{GITHUB_FOUNDRY_REPO}/raw/master/util/"
+    f"{GITHUB_URL}/{GITHUB_ORG}/{GITHUB_FOUNDRY_REPO}/raw/master/util/"
     f"schema/registry_schema.json"
 )
 
 # The URL where information (e.g. long names) about ontologies can be retrieved.
 ONTOLOGY_METADATA_URL = (
-    f"https://github.com/{GITHUB_ORG}/{GITHUB_FOUNDRY_REPO}/raw/"
+    f"{GITHUB_URL}/{GITHUB_ORG}/{GITHUB_FOUNDRY_REPO}/raw/"
     f"master/registry/ontologies.yml"
 )
 
+# How often (in seconds) to check whether the ontology metadata and the PURL and REGISTRY
+# validation schemas have changed, and if so to reload them. Set to 0 to only load them at startup.
+METADATA_REFRESH_INTERVAL = int(os.getenv("METADATA_REFRESH_INTERVAL", 300))
+
+# The number of seconds for which the listing of config files shown on the index page is considered
+# fresh. After that it is still served for up to INDEX_CACHE_MAX_STALE seconds while it is reloaded
+# in the background.
+# Note that if GitHub webhooks are enabled (see GITHUB_WEBHOOK_SECRET below), cached data is
+# invalidated as soon as it changes, and these can safely be set much higher.
+INDEX_CACHE_TTL = int(os.getenv("INDEX_CACHE_TTL", 300))
+INDEX_CACHE_MAX_STALE = int(os.getenv("INDEX_CACHE_MAX_STALE", 86400))
+
+# The maximum number of validation results to remember, and for how long (in seconds), so that
+# identical code does not need to be validated again:
+VALIDATION_CACHE_SIZE = int(os.getenv("VALIDATION_CACHE_SIZE", 1024))
+VALIDATION_CACHE_TTL = int(os.getenv("VALIDATION_CACHE_TTL", 3600))
+
+# The maximum number of logged in users whose identity (their access token, GitHub login and GitHub
+# profile) is kept in memory, and for how long (in seconds), so that the users database need not be
+# read on every request:
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", 1024))
+IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 600))
+
+# The number of threads that submit pull requests to GitHub in the background. Every submission is
+# recorded as a job in the database, so that submissions interrupted by a restart of the server are
+# resumed when it starts again:
+SUBMISSION_WORKERS = int(os.getenv("SUBMISSION_WORKERS", 4))
+
+# The number of seconds after which a started submission job that has made no progress is assumed
+# to have been interrupted (e.g. by a restart of the server carrying it out), and is resumed by any
+# instance of the editor. Every instance looks for such jobs every JOB_LEASE / 2 seconds.
+JOB_LEASE = int(os.getenv("JOB_LEASE", 600))
+
+# The GitHub logins, separated by commas, of the administrators of the editor. Administrators can
+# profile any request by adding ?profile=1 to its URL (or ?profile=text to see a summary of the
+# profile instead of the usual response). Profiles are saved in PROFILE_DIR.
+ADMIN_USERS = [login.strip() for login in os.getenv("ADMIN_USERS", "").split(",") if login.strip()]
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/metadata-editor-profiles")
+
+# The token that must be given, as "Authorization: Bearer <token>", to scrape the editor's metrics
+# at /metrics (e.g. with Prometheus' bearer_token setting). If this is not set, the metrics
+# endpoint is disabled.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# The static assets that are combined into bundles, so that the editor page can load all of them in
+# a couple of requests rather than one request per file. The bundles are built, minified, into
+# ASSET_BUILD_DIR when the editor starts, or beforehand with tools/build_assets.py. They are also
+# precompressed with gzip and, if the brotli package is installed, brotli.
+ASSET_BUNDLES = {
+    "editor-page.css": [
+        "3pp/codemirror/lib/codemirror.css",
+        "3pp/codemirror/addon/display/fullscreen.css",
+        "3pp/codemirror/addon/hint/show-hint.css",
+        "editor.css",
+    ],
+    "editor-page.js": [
+        "3pp/codemirror/lib/codemirror.js",
+        "3pp/codemirror/addon/dialog/dialog.js",
+        "3pp/codemirror/addon/search/searchcursor.js",
+        "3pp/codemirror/addon/edit/matchbrackets.js",
+        "3pp/codemirror/addon/display/fullscreen.js",
+        "3pp/codemirror/mode/yaml/yaml.js",
+        "3pp/codemirror/addon/hint/show-hint.js",
+        "editor.js",
+    ],
+}
+ASSET_BUILD_DIR = os.getenv("ASSET_BUILD_DIR", os.path.join(PWD, "build"))
+
 # Used to help prevent CSRF attacks:
 FLASK_SECRET_KEY = os.getenv("FLASK_SECRET_KEY")
 
 # Location of the database file:
-DATABASE_URI = "sqlite:////tmp/github-flask.db"
+DATABASE_URI = os.getenv("DATABASE_URI", "sqlite:////tmp/github-flask.db")
+
+# The number of connections to the database kept open by the editor, and the number of additional
+# connections that it may open when they are all in use:
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 5))
+DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+
+# How long (in seconds) a write to an SQLite database waits for another process's write to finish:
+DATABASE_BUSY_TIMEOUT = int(os.getenv("DATABASE_BUSY_TIMEOUT", 30))
+
+# How long (in days) to keep the records of users who have not logged in since, and of finished
+# submission jobs, and how often (in seconds) to delete the records older than that. A user whose
+# record has been deleted needs to log in again. Set DB_COMPACTION_INTERVAL to 0 to keep every
+# record.
+USER_RETENTION_DAYS = int(os.getenv("USER_RETENTION_DAYS", 90))
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", 30))
+DB_COMPACTION_INTERVAL = int(os.getenv("DB_COMPACTION_INTERVAL", 86400))
 
 # GitHub OAuth parameters used to access the GitHub API
 GITHUB_APP_STATE = os.getenv("GITHUB_APP_STATE")
 GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
 GITHUB_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
+# The secret used to sign the deliveries of the GitHub webhook which notifies the editor of pushes,
+# issues and pull requests in the PURL and Foundry repositories. The webhook should be configured,
+# with content type application/json, to deliver to <FLASK_HOST>/github_webhook. If this is not
+# set, the webhook endpoint is disabled.
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+
+# Settings for the connection pool used to communicate with GitHub. The pool size is the maximum
+# number of keep-alive connections kept open to each GitHub host, and should be at least as large
+# as the number of threads serving requests. Timeouts are in seconds.
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", 10))
+GITHUB_CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", 5))
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", 30))
+# The number of times to retry a GitHub call that fails with a 5xx status or due to rate limiting,
+# and the backoff factor (in seconds) used to compute the exponentially increasing delay between
+# retries.
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", 3))
+GITHUB_RETRY_BACKOFF = float(os.getenv("GITHUB_RETRY_BACKOFF", 0.5))
+# The maximum number of GitHub responses to keep for making conditional (ETag based) requests:
+GITHUB_CACHE_SIZE = int(os.getenv("GITHUB_CACHE_SIZE", 2048))
+
+# When fewer than this many of a user's GitHub API requests remain before their rate limit is reset,
+# pages are built from cached GitHub data, where possible, instead of spending more requests:
+GITHUB_RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", 100))
 
 # Template used to generate the initial text when launching the editor with a new PURL configuration
 # file:
@@ -74,6 +74,39 @@ $(document).ready(function(){
   });
 });
 
+/**
+ * Warn the user, on every page, if their GitHub API rate limit budget is running low. While it is,
+ * the server builds pages from cached GitHub data where it can, so they may be out of date.
+ */
+$(document).ready(function(){
+  var warning = document.getElementById("rate-limit-warning");
+  if (!warning) {
+    return;
+  }
+  var request = new XMLHttpRequest();
+  request.onreadystatechange = function() {
+    if (request.readyState === 4 && request.status === 200) {
+      var budget = JSON.parse(request.responseText);
+      if (!budget.low) {
+        return;
+      }
+      var text;
+      if (budget.blocked_for > 0) {
+        text = 'GitHub has asked the editor to pause its requests for ' + budget.blocked_for +
+          ' seconds.';
+      } else {
+        text = 'You have ' + budget.remaining + ' of ' + budget.limit + ' GitHub API requests ' +
+          'left until ' + new Date(budget.reset * 1000).toLocaleTimeString() + '.';
+      }
+      warning.innerHTML = text + ' Until then, the lists of configurations shown may be out ' +
+        'of date.';
+      warning.style.display = 'block';
+    }
+  }
+  request.open('GET', '/rate_limit', true);
+  request.send();
+});
+
 let hasChanged = false;
 /**
  * Handler to show popup when you leave the page, only if the code editor has unsaved changes.
@@ -116,6 +149,7 @@ if (document.getElementById("code")) {
     mode: "text/x-yaml",
     theme: "default",
     lineNumbers: true,
+    gutters: ["CodeMirror-linenumbers", "validation-gutter"],
     matchBrackets: true,
     showCursorWhenSelecting: true,
     extraKeys: {
@@ -444,6 +478,85 @@ var purlYamlHint = function(editor, options) {
 
 };
 
+/**
+ * Escapes the given text so that it can be safely inserted into HTML.
+ */
+var escapeHtml = function(text) {
+  return String(text).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+}
+
+/**
+ * Displays the given list of validation results (as returned by the server when all errors are
+ * requested): every problem is marked in the editor's gutter, and all of them are summarised in the
+ * status area.
+ */
+var showValidationResults = function(results) {
+  var levels = ['error', 'warning', 'info'];
+  var worst = levels.length;
+  var alertText = '';
+  var alertTextDetail = '';
+
+  results.forEach(function(result) {
+    var level = levels.indexOf(result.result_type);
+    if (level >= 0 && level < worst) {
+      worst = level;
+    }
+    var where = result.line_number >= 0 ? 'Line ' + result.line_number + ': ' : '';
+    alertText += '<li>' + escapeHtml(where + result.summary) + '</li>';
+    alertTextDetail += escapeHtml(where + result.details) + '\n\n';
+
+    // Mark the line in the gutter, with the summary of every problem on the line as its tooltip:
+    if (result.line_number >= 0) {
+      var line = result.line_number - 1;
+      var info = editor.lineInfo(line);
+      var marker = info && info.gutterMarkers && info.gutterMarkers["validation-gutter"];
+      if (!marker) {
+        marker = document.createElement("div");
+        marker.className = "validation-marker validation-" + result.result_type;
+        marker.innerHTML = "&#9679;";
+        marker.title = result.summary;
+        marker.dataset.level = level;
+        editor.setGutterMarker(line, "validation-gutter", marker);
+      } else {
+        // Show the most severe level of the problems on this line:
+        marker.title += "\n" + result.summary;
+        if (level >= 0 && level < Number(marker.dataset.level)) {
+          marker.className = "validation-marker validation-" + result.result_type;
+          marker.dataset.level = level;
+        }
+      }
+    }
+  });
+
+  if (results.length === 0) {
+    showAlertFor("Validation successful", "alert-success");
+    get_commit_btn().disabled = false;
+    set_draft(false);
+    return;
+  }
+
+  var problems = results.length === 1 ? '1 problem' : results.length + ' problems';
+  if (worst === 0) {
+    alertText = 'Validation failed: ' + problems + ' found.<ul>' + alertText + '</ul>';
+    showAlertFor(alertText, "alert-danger", alertTextDetail);
+    set_draft(true);  //Enable "submit as draft" option
+  } else if (worst === 1) {
+    showAlertFor('Warning: ' + problems + ' found.<ul>' + alertText + '</ul>', "alert-warning",
+                 alertTextDetail);
+    set_draft(false);
+  } else {
+    showAlertFor('Information: ' + problems + ' found.<ul>' + alertText + '</ul>', "alert-info",
+                 alertTextDetail);
+    set_draft(false);
+  }
+  get_commit_btn().disabled = false;
+
+  // Scroll the first problem into view:
+  if (results[0].line_number >= 0) {
+    editor.scrollIntoView(what={line: results[0].line_number - 1, ch: 0}, margin=32);
+  }
+}
+
 /**
  * Validates the contents of the editor, displaying the validation result in the status area.
  */
@@ -454,8 +567,9 @@ var validate = function(filename, editor_type) {
   // Extract the code from the text area:
   var code = document.getElementById("code").value;
 
-  // Clear the status area:
+  // Clear the status area and any markers left by the previous validation:
   showAlertFor("Validating ...", "alert-info") ;
+  editor.clearGutter("validation-gutter");
 
   // Before doing anything else, make sure that the idspace indicated in the code matches the
   // idspace being edited:
@@ -494,6 +608,10 @@ var validate = function(filename, editor_type) {
          alertTextDetail = '';
          try { //Parse JSON if possible, use "result type" to decide message
             var response = JSON.parse(request.responseText);
+            if (Array.isArray(response)) {
+                showValidationResults(response);
+                return;
+            }
             if (response.result_type === 'error') {
                 alertText = 'Validation failed ';
                 alertLevel = "alert-danger";
@@ -558,11 +676,43 @@ var validate = function(filename, editor_type) {
   request.open('POST', '/validate', true);
   request.setRequestHeader('Content-type', 'application/x-www-form-urlencoded');
   request.send("code=" + encodeURIComponent(code) +
-               "&editor_type=" + editor_type);
+               "&editor_type=" + editor_type +
+               "&all_errors=true");
   $("*").css("cursor", "progress");
 };
 
 
+/**
+ * Follow the progress of the given submission job, as returned by the server, polling the server
+ * for its status until it has finished. Once the PR has been created, call onDone with its info.
+ */
+var waitForSubmission = function(job, failureText, onDone) {
+  if (job.status === 'done') {
+    onDone(job.pr_info);
+    return;
+  }
+  if (job.status === 'failed') {
+    showAlertFor(failureText + "\n\n" + escapeHtml(job.error), "alert-danger");
+    return;
+  }
+  showAlertFor(job.description + " ...", "alert-info");
+
+  setTimeout(function() {
+    var request = new XMLHttpRequest();
+    request.onreadystatechange = function() {
+      if (request.readyState === 4) {
+        if (request.status === 200) {
+          waitForSubmission(JSON.parse(request.responseText), failureText, onDone);
+        } else {
+          showAlertFor("Problem communicating with server", "alert-danger");
+        }
+      }
+    }
+    request.open('GET', '/jobs/' + job.job_id, true);
+    request.send();
+  }, 1000);
+};
+
 /**
  * Submit a pull request to github to add a new configuration to the repository.
  */
@@ -620,37 +770,38 @@ var add_config = function(filename, editor_type, issueNumber, addIssueLink) {
                     if (!request.status) {
                       showAlertFor("Problem communicating with server","alert-danger");
                     }
-                    else if (request.status === 200) {
-                      var response = JSON.parse(request.responseText);
-                      var prInfo = response['pr_info'];
-                      var nextBtn = document.getElementById('next-step-btn');
-                      if (nextBtn) {
-                          nextBtn.disabled = false;
-                          if (editor_type == 'registry') {
-                            nextBtn.addEventListener("click", function() {
-                               loadEditorFor(issueNumber,prInfo['html_url']);
-                            });
-                          } else {
-                            nextBtn.addEventListener("click", function() {
-                               window.location.href = "/";
-                             });
-                          }
-                      }
-                      var nextStepTxt = '' ;
-                      if (editor_type == 'registry' && issueNumber) {
-                        nextStepTxt = 'The next step is to ' +
-                      '<a href="javascript:loadEditorFor(\'' + issueNumber + '\',\'' +
-                        prInfo['html_url'] +'\');">Create a PURL config</a>.';
-                      }
-                      if (editor_type == 'purl' && addIssueLink) {
-                        nextStepTxt = 'You\'re all done! The PR for the registry config was <a href="'+
-                         addIssueLink+'" target="__blank">also</a> successfully submitted.';
-                      }
-                      showAlertFor('New configuration submitted successfully. It will be ' +
-                        'reviewed by a moderator before being added to the repository. Click ' +
-                        '<a href="' + prInfo['html_url'] + '" target="__blank">here</a> to view your ' +
-                        'pull request on GitHub. ' + nextStepTxt,"alert-success");
-                      hasChanged = false;
+                    else if (request.status === 202) {
+                      waitForSubmission(JSON.parse(request.responseText), "Submission of new configuration failed.",
+                                        function(prInfo) {
+                        var nextBtn = document.getElementById('next-step-btn');
+                        if (nextBtn) {
+                            nextBtn.disabled = false;
+                            if (editor_type == 'registry') {
+                              nextBtn.addEventListener("click", function() {
+                                 loadEditorFor(issueNumber,prInfo['html_url']);
+                              });
+                            } else {
+                              nextBtn.addEventListener("click", function() {
+                                 window.location.href = "/";
+                               });
+                            }
+                        }
+                        var nextStepTxt = '' ;
+                        if (editor_type == 'registry' && issueNumber) {
+                          nextStepTxt = 'The next step is to ' +
+                        '<a href="javascript:loadEditorFor(\'' + issueNumber + '\',\'' +
+                          prInfo['html_url'] +'\');">Create a PURL config</a>.';
+                        }
+                        if (editor_type == 'purl' && addIssueLink) {
+                          nextStepTxt = 'You\'re all done! The PR for the registry config was <a href="'+
+                           addIssueLink+'" target="__blank">also</a> successfully submitted.';
+                        }
+                        showAlertFor('New configuration submitted successfully. It will be ' +
+                          'reviewed by a moderator before being added to the repository. Click ' +
+                          '<a href="' + prInfo['html_url'] + '" target="__blank">here</a> to view your ' +
+                          'pull request on GitHub. ' + nextStepTxt,"alert-success");
+                        hasChanged = false;
+                      });
                     }
                     else {
                       // Display the error message in the status area. Note that we must replace any angle
@@ -687,7 +838,7 @@ var add_config = function(filename, editor_type, issueNumber, addIssueLink) {
 /**
  * Submit a pull request to github to update the given configuration file in the repository.
  */
-var update_config = function(filename,editor_type) {
+var update_config = function(filename,editor_type,base_sha) {
   var projectName = filename.toUpperCase().substring(0, filename.lastIndexOf('.'));
   $("#commit-msg").attr('value','Updating ' + filename);
   if (editor_type == 'registry') {
@@ -740,14 +891,15 @@ var update_config = function(filename,editor_type) {
                     if (!request.status) {
                       showAlertFor("Problem communicating with server","alert-danger");
                     }
-                    else if (request.status === 200) {
-                      var response = JSON.parse(request.responseText);
-                      var prInfo = response['pr_info'];
-                      showAlertFor('Update submitted successfully. The changes will be ' +
-                        'reviewed by a moderator before being added to the repository. Click ' +
-                        '<a href="' + prInfo['html_url'] + '" target="__blank">here</a> to view your ' +
-                        'pull request on GitHub.',"alert-success");
-                      hasChanged = false;
+                    else if (request.status === 202) {
+                      waitForSubmission(JSON.parse(request.responseText), "Submission of update failed.",
+                                        function(prInfo) {
+                        showAlertFor('Update submitted successfully. The changes will be ' +
+                          'reviewed by a moderator before being added to the repository. Click ' +
+                          '<a href="' + prInfo['html_url'] + '" target="__blank">here</a> to view your ' +
+                          'pull request on GitHub.',"alert-success");
+                        hasChanged = false;
+                      });
                     }
                     else {
                       // Display the error message in the status area. Note that we must replace any angle
@@ -766,6 +918,7 @@ var update_config = function(filename,editor_type) {
                              '&draft='+ draft +
                              '&code=' + encodeURIComponent(code) +
                              '&editor_type='+editor_type +
+                             '&base_sha=' + base_sha +
                              '&long_msg=' + msgBody)
                 $("*").css("cursor", "progress");
           }
@@ -0,0 +1,427 @@
+import hashlib
+import logging
+import threading
+import time
+
+import requests
+
+from cache import LRUCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Response codes from GitHub that are worth retrying: server-side hiccups and (primary) rate
+# limiting. Secondary rate limits are reported as a 403 with a Retry-After header and are handled
+# separately in GitHubClient.request(), since most 403s are permanent and must not be retried.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# HTTP methods that are safe to retry automatically. POST is excluded since retrying it could,
+# for example, create the same branch or pull request twice.
+RETRY_METHODS = frozenset(["GET", "HEAD", "PUT", "PATCH", "DELETE", "OPTIONS"])
+
+
+class GitHubClient:
+    """
+    A client for GitHub's REST and OAuth APIs which keeps a pool of persistent (keep-alive)
+    connections, so that sequential calls to GitHub do not each pay for a new TCP and TLS
+    handshake. The client applies default connect and read timeouts to every request and retries
+    requests, with exponential backoff, that fail with a 5xx status or because of rate limiting.
+    A single instance is safe to share between request threads.
+
+    If a ConditionalRequestCache is given, GET requests to the REST API are made conditional on the
+    cached copy of the response having changed, and the cached copy is reused when GitHub answers
+    with 304 Not Modified.
+
+    If a RateLimitGovernor is given, the rate limit budget of each access token is tracked, and
+    while it is running low (or GitHub is refusing the token's requests) non-urgent GET requests are
+    answered with the cached copy of their response, when there is one, without asking GitHub.
+
+    If an observer is given, it is called after every call to the REST API with the method, the
+    endpoint, the response, the time taken (in seconds) and the source of the response (see _api()).
+    """
+
+    def __init__(
+        self,
+        api_url,
+        oauth_url,
+        headers=None,
+        pool_size=10,
+        connect_timeout=5,
+        read_timeout=30,
+        max_retries=3,
+        backoff_factor=0.5,
+        max_retry_after=60,
+        cache=None,
+        governor=None,
+        observer=None,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.oauth_url = oauth_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_retry_after = max_retry_after
+        self.cache = cache
+        self.governor = governor
+        self.observer = observer
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def request(self, method, url, scope=None, **kwargs):
+        """
+        Send a request using the pooled session and return the response. A request that is
+        rejected because of GitHub's secondary rate limit (a 403 carrying a Retry-After header) is
+        retried after waiting for the indicated time, as long as that time is reasonably short. If
+        the scope of the access token used is given, the rate limit headers of every response are
+        reported to the governor, and a request is delayed while GitHub has asked us to back off
+        from making requests with that token.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if self.governor is not None and scope is not None:
+            self.governor.wait(scope, self.max_retry_after)
+        attempt = 0
+        while True:
+            response = self.session.request(method, url, **kwargs)
+            if self.governor is not None and scope is not None:
+                self.governor.record(scope, response)
+            retry_after = secondary_rate_limit_delay(response)
+            if retry_after is None or attempt >= self.max_retries:
+                return response
+            if retry_after > self.max_retry_after:
+                logger.warning(
+                    f"Secondary rate limit hit for {method} {url}; not retrying since GitHub asks "
+                    f"us to wait {retry_after} seconds"
+                )
+                return response
+            attempt += 1
+            delay = max(retry_after, self.backoff_factor * (2**attempt))
+            logger.warning(
+                f"Secondary rate limit hit for {method} {url}; retrying in {delay} seconds "
+                f"(attempt {attempt} of {self.max_retries})"
+            )
+            time.sleep(delay)
+
+    def api(self, method, endpoint, access_token, params={}, urgent=False):
+        """
+        Call the GitHub REST API at the given endpoint using the given method, authenticating with
+        the given access token, and return GitHub's response. Parameters for GET requests are
+        sent in the query string; for all other methods they are sent as a JSON body. GET requests
+        that need an up to date response, even when the token's rate limit budget is running low,
+        must be marked as urgent.
+        """
+        if not endpoint.startswith("/"):
+            endpoint = "/" + endpoint
+
+        start = time.perf_counter()
+        response, source = self._api(method, endpoint, access_token, params, urgent)
+        if self.observer is not None:
+            self.observer(method.upper(), endpoint, response, time.perf_counter() - start, source)
+        return response
+
+    def _api(self, method, endpoint, access_token, params, urgent):
+        """
+        Make a call for api(), and return the response along with its source: 'github' for a
+        response sent by GitHub, 'revalidated' for a cached response confirmed by GitHub to be up to
+        date, or 'cache' for a cached response returned without contacting GitHub.
+        """
+        scope = token_scope(access_token)
+        headers = {"Authorization": f"token {access_token}"}
+        if method.casefold() != "get":
+            response = self.request(
+                method.upper(), self.api_url + endpoint, scope, headers=headers, json=params
+            )
+            return response, "github"
+
+        # GET parameters must go in URL - https://developer.github.com/v3/#parameters
+        if self.cache is None:
+            response = self.request(
+                "GET", self.api_url + endpoint, scope, headers=headers, params=params
+            )
+            return response, "github"
+
+        key = self.cache.key(scope, endpoint, params)
+        cached = self.cache.lookup(key)
+        if cached is not None:
+            if not urgent and self.governor is not None and self.governor.is_low(scope):
+                logger.info(f"Rate limit budget is low; using the cached response for {endpoint}")
+                self.governor.record_deferral()
+                return cached, "cache"
+            headers.update(self.cache.conditional_headers(cached))
+        response = self.request(
+            "GET", self.api_url + endpoint, scope, headers=headers, params=params
+        )
+        if response.status_code == 304 and cached is not None:
+            self.cache.record_hit()
+            return cached, "revalidated"
+        self.cache.record_miss()
+        if response.ok:
+            self.cache.store(key, response)
+        elif cached is not None and is_rate_limited(response):
+            logger.warning(f"Rate limited by GitHub; using the cached response for {endpoint}")
+            return cached, "cache"
+        return response, "github"
+
+    def oauth(self, method, path, params):
+        """
+        Call the given path of GitHub's OAuth API using the given method and authentication
+        parameters and return GitHub's response.
+        """
+        if not path.startswith("/"):
+            path = "/" + path
+
+        kwargs = {"params": params} if method.casefold() == "get" else {"data": params}
+        return self.request(method.upper(), self.oauth_url + path, **kwargs)
+
+
+class ConditionalRequestCache:
+    """
+    A size-bounded LRU cache of GitHub's responses to GET requests, keyed by the scope of the
+    access token used, the endpoint and the request parameters. Along with each response we keep
+    its ETag and Last-Modified validators, which are sent back to GitHub with the next request for
+    the same resource. GitHub answers such a request with 304 Not Modified if the resource has not
+    changed, and does not count it against the rate limit.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.entries = LRUCache(max_entries)
+        # Hits are requests answered from the cache after a 304; misses are requests for which
+        # GitHub sent back a full response.
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(scope, endpoint, params):
+        """
+        Return the cache key for a GET request to the given endpoint with the given params, made
+        with an access token having the given scope.
+        """
+        return (scope, endpoint, tuple(sorted((str(k), str(v)) for k, v in params.items())))
+
+    def lookup(self, key):
+        """
+        Return the cached response for the given key, or None.
+        """
+        return self.entries.peek(key)
+
+    def store(self, key, response):
+        """
+        Cache the given response under the given key if it carries a validator that can be used to
+        make a conditional request for it.
+        """
+        if "ETag" in response.headers or "Last-Modified" in response.headers:
+            self.entries.set(key, response)
+        else:
+            self.entries.pop(key)
+
+    @staticmethod
+    def conditional_headers(response):
+        """
+        Return the headers needed to make a request conditional on the given cached response
+        having changed.
+        """
+        headers = {}
+        if "ETag" in response.headers:
+            headers["If-None-Match"] = response.headers["ETag"]
+        if "Last-Modified" in response.headers:
+            headers["If-Modified-Since"] = response.headers["Last-Modified"]
+        return headers
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def invalidate(self, predicate):
+        """
+        Remove the cached responses for every endpoint satisfying the given predicate, for all
+        token scopes, and return the number of responses removed.
+        """
+        return self.entries.invalidate(lambda key: predicate(key[1]))
+
+    def stats(self):
+        """
+        Return a dictionary summarising the current state of the cache.
+        """
+        stats = self.entries.stats()
+        stats.update({"hits": self.hits, "misses": self.misses})
+        return stats
+
+
+class RateLimitGovernor:
+    """
+    Keeps track of the GitHub rate limit budget of each access token (identified by its scope; see
+    token_scope()), as reported in the X-RateLimit-* headers of GitHub's responses, and of any
+    backoff period requested by GitHub in a Retry-After header. The budget of a token is low when
+    fewer than `reserve` requests remain before the limit is reset, or while GitHub is refusing its
+    requests.
+    """
+
+    def __init__(self, reserve=100):
+        self.reserve = reserve
+        self.deferrals = 0
+        # Budgets are dictionaries, keyed by scope, of the latest rate limit headers seen:
+        self._budgets = {}
+        # The times (in seconds since the epoch) until which GitHub has asked us to back off:
+        self._blocked_until = {}
+        self._lock = threading.Lock()
+
+    def record(self, scope, response):
+        """
+        Record the rate limit information in the given response to a request made with an access
+        token having the given scope.
+        """
+        headers = response.headers
+        now = time.time()
+        with self._lock:
+            if (
+                "X-RateLimit-Remaining" in headers
+                and headers.get("X-RateLimit-Resource", "core") == "core"
+            ):
+                try:
+                    self._budgets[scope] = {
+                        "limit": int(headers.get("X-RateLimit-Limit", 0)),
+                        "remaining": int(headers["X-RateLimit-Remaining"]),
+                        "reset": int(headers.get("X-RateLimit-Reset", 0)),
+                    }
+                except ValueError:
+                    logger.warning(f"Ignoring malformed rate limit headers: {dict(headers)}")
+
+            if not is_rate_limited(response):
+                return
+            retry_after = retry_after_delay(response)
+            if retry_after is not None:
+                self._blocked_until[scope] = max(
+                    self._blocked_until.get(scope, 0), now + retry_after
+                )
+            else:
+                budget = self._budgets.get(scope)
+                if budget and budget["reset"] > now:
+                    self._blocked_until[scope] = budget["reset"]
+
+    def blocked_for(self, scope):
+        """
+        Return the number of seconds for which GitHub has asked us not to make requests with an
+        access token having the given scope.
+        """
+        with self._lock:
+            return max(self._blocked_until.get(scope, 0) - time.time(), 0)
+
+    def is_low(self, scope):
+        """
+        Return True if the rate limit budget of the access token with the given scope is low.
+        """
+        if self.blocked_for(scope) > 0:
+            return True
+        with self._lock:
+            budget = self._budgets.get(scope)
+            return (
+                budget is not None
+                and budget["remaining"] < self.reserve
+                and budget["reset"] > time.time()
+            )
+
+    def wait(self, scope, max_wait):
+        """
+        If GitHub has asked us to back off from making requests with an access token having the
+        given scope, wait until it allows them again, as long as that is within max_wait seconds.
+        There is no point in waiting any longer than that, and so a request for which the wait would
+        be longer is sent straight away (and presumably refused).
+        """
+        delay = self.blocked_for(scope)
+        if 0 < delay <= max_wait:
+            logger.warning(f"Backing off from GitHub for {delay:.1f} seconds")
+            time.sleep(delay)
+
+    def record_deferral(self):
+        with self._lock:
+            self.deferrals += 1
+
+    def budget(self, scope):
+        """
+        Return a dictionary describing the current rate limit budget of the access token with the
+        given scope: the limit, the number of requests remaining, the time (in seconds since the
+        epoch) when the budget is reset, the number of seconds for which GitHub has asked us to back
+        off, and whether the budget is low. The limit, remaining and reset are None if no response
+        to a request made with the token has been seen yet.
+        """
+        with self._lock:
+            budget = dict(
+                self._budgets.get(scope) or dict.fromkeys(["limit", "remaining", "reset"])
+            )
+        budget["blocked_for"] = round(self.blocked_for(scope))
+        budget["low"] = self.is_low(scope)
+        return budget
+
+    def stats(self):
+        """
+        Return a dictionary summarising the state of the governor.
+        """
+        with self._lock:
+            return {
+                "tokens": len(self._budgets),
+                "low": sum(
+                    1 for scope in self._budgets if self._budgets[scope]["remaining"] < self.reserve
+                ),
+                "deferrals": self.deferrals,
+            }
+
+
+def token_scope(access_token):
+    """
+    Return an opaque identifier for the given access token, suitable for keeping the cached
+    responses seen by different users apart without holding on to the tokens themselves.
+    """
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+
+
+def secondary_rate_limit_delay(response):
+    """
+    If the given response indicates that GitHub's secondary rate limit has been hit, return the
+    number of seconds that GitHub asks us to wait before trying again, otherwise return None.
+    """
+    if response.status_code != 403:
+        return None
+    return retry_after_delay(response)
+
+
+def retry_after_delay(response):
+    """
+    Return the number of seconds given in the Retry-After header of the given response, or None.
+    """
+    try:
+        return max(int(response.headers["Retry-After"]), 0)
+    except (KeyError, ValueError):
+        return None
+
+
+def is_rate_limited(response):
+    """
+    Return True if the given response indicates that a request was refused because of one of
+    GitHub's rate limits.
+    """
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+    )
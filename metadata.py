@@ -0,0 +1,226 @@
+import json
+import logging
+import parsing
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def parse_ontology_metadata(text):
+    """
+    Parse the text of the registry's ontologies.yml file and return the list of ontologies in it.
+    """
+    return parsing.load(text)["ontologies"]
+
+
+def parse_schema(text):
+    """
+    Parse the text of a JSON schema.
+    """
+    return json.loads(text)
+
+
+class MetadataSnapshot:
+    """
+    A consistent set of the ontology metadata and validation schemas that were current at a given
+    point in time. The resources in a snapshot are never modified once it has been created; whenever
+    any of them changes a new snapshot, with a higher version number, replaces the old one. The
+    ontology metadata is indexed by ontology id when the snapshot is created.
+    """
+
+    def __init__(
+        self, version=0, ontology_md=[], purl_schema={}, registry_schema={}, versions=None
+    ):
+        self.version = version
+        self.ontology_md = ontology_md
+        self.purl_schema = purl_schema
+        self.registry_schema = registry_schema
+        # The snapshot version in which each of the resources last changed:
+        self.versions = versions or dict.fromkeys(MetadataRefresher.parsers, version)
+
+        # Index the title and description of every ontology by its id:
+        self.ontologies = {
+            o["id"]: {"title": o.get("title", ""), "description": o.get("description", "")}
+            for o in ontology_md
+            if "id" in o
+        }
+        # The most recent result of join_configs(), along with the arguments it was computed for:
+        self._joined = (None, None)
+
+    def describe(self, ontology_id):
+        """
+        Return the title and description of the ontology with the given id, or empty strings if
+        the ontology is unknown.
+        """
+        ontology = self.ontologies.get(ontology_id)
+        if ontology is None:
+            return "", ""
+        return ontology["title"], ontology["description"]
+
+    def join_configs(self, purl_filenames, registry_filenames):
+        """
+        Given dictionaries mapping ontology ids to the names of their PURL and registry
+        configuration files, return a record for every id having either kind of file, containing
+        the names of the files along with the title and description of the ontology. Since the
+        lists of files rarely change, the result for the most recent arguments is remembered.
+        """
+        key = (tuple(purl_filenames.items()), tuple(registry_filenames.items()))
+        joined_key, joined = self._joined
+        if joined_key == key:
+            return joined
+
+        joined = []
+        registry_only = [i for i in registry_filenames if i not in purl_filenames]
+        for config_id in list(purl_filenames) + registry_only:
+            title, description = self.describe(config_id)
+            joined.append(
+                {
+                    "id": config_id,
+                    "purl_filename": purl_filenames.get(config_id),
+                    "registry_filename": registry_filenames.get(config_id),
+                    "title": title,
+                    "description": description,
+                }
+            )
+        self._joined = (key, joined)
+        return joined
+
+    def replace(self, **resources):
+        """
+        Return a new snapshot, with the next version number, in which the given resources replace
+        the ones in this snapshot.
+        """
+        fields = {
+            "ontology_md": self.ontology_md,
+            "purl_schema": self.purl_schema,
+            "registry_schema": self.registry_schema,
+        }
+        fields.update(resources)
+        versions = dict(self.versions)
+        versions.update(dict.fromkeys(resources, self.version + 1))
+        return MetadataSnapshot(self.version + 1, versions=versions, **fields)
+
+
+class MetadataRefresher:
+    """
+    Keeps a current MetadataSnapshot of the ontology metadata and the PURL and registry validation
+    schemas. The resources are re-fetched by a background thread every `interval` seconds using
+    conditional requests, so that unchanged resources are neither downloaded nor parsed again, and
+    changed resources are parsed off the request path and swapped in atomically. Request handlers
+    read the `snapshot` attribute, which always refers to a complete, already parsed snapshot.
+    """
+
+    # The resources making up a snapshot, and the functions used to parse them:
+    parsers = {
+        "ontology_md": parse_ontology_metadata,
+        "purl_schema": parse_schema,
+        "registry_schema": parse_schema,
+    }
+
+    def __init__(self, client, urls, interval=300):
+        """
+        Initialise the refresher to fetch resources using the given GitHubClient, from the given
+        dictionary of URLs, which must contain a URL for every resource in `parsers`.
+        """
+        self.client = client
+        self.urls = urls
+        self.interval = interval
+        self.snapshot = MetadataSnapshot()
+        self._validators = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def fetch(self, name):
+        """
+        Fetch and parse the given resource, returning None if it has not changed since it was last
+        fetched.
+        """
+        url = self.urls[name]
+        headers = {"Accept": "*/*"}
+        validators = self._validators.get(name, {})
+        if "ETag" in validators:
+            headers["If-None-Match"] = validators["ETag"]
+        if "Last-Modified" in validators:
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        response = self.client.request("GET", url, headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        parsed = self.parsers[name](response.text)
+        self._validators[name] = {
+            header: response.headers[header]
+            for header in ["ETag", "Last-Modified"]
+            if header in response.headers
+        }
+        return parsed
+
+    def refresh(self):
+        """
+        Re-fetch all of the resources and, if any of them has changed, atomically replace the
+        current snapshot with one containing the new versions. A resource that cannot be fetched or
+        parsed keeps its previous version. Returns True if the snapshot was replaced.
+        """
+        with self._lock:
+            changed = {}
+            for name in self.parsers:
+                try:
+                    resource = self.fetch(name)
+                except Exception as e:
+                    logger.error(f"Could not retrieve {name} from {self.urls[name]}: {e}")
+                    continue
+                if resource is not None:
+                    changed[name] = resource
+
+            if not changed:
+                return False
+            self.snapshot = self.snapshot.replace(**changed)
+            logger.info(
+                f"Refreshed {', '.join(changed)}; metadata is now at version "
+                f"{self.snapshot.version}"
+            )
+            return True
+
+    def run(self):
+        """
+        Refresh the resources every `interval` seconds, or sooner if triggered, until stopped.
+        """
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Unexpected error while refreshing metadata: {e}")
+
+    def start(self):
+        """
+        Start refreshing the resources in a background thread. Does nothing if the refresh interval
+        is not positive or if the thread has already been started.
+        """
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="metadata-refresher", daemon=True)
+        self._thread.start()
+
+    def trigger(self):
+        """
+        Refresh the resources as soon as possible, without blocking the caller. This is used when we
+        are notified that a resource has changed.
+        """
+        if self._thread is None:
+            threading.Thread(target=self.refresh, name="metadata-refresh", daemon=True).start()
+        else:
+            self._wake.set()
+
+    def stop(self):
+        """
+        Stop the background refresh thread.
+        """
+        self._stop.set()
+        self._wake.set()
@@ -0,0 +1,364 @@
+import re
+import threading
+import time
+
+from contextlib import contextmanager
+from flask import before_render_template, g, has_app_context, request, template_rendered
+
+# A minimal implementation of the metric types of Prometheus' text exposition format
+# (https://prometheus.io/docs/instrumenting/exposition_formats/), sufficient for the editor's own
+# histograms and for reporting the statistics that its caches already keep.
+
+# Default histogram buckets (in seconds) for timing requests to the editor and to GitHub:
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Default histogram buckets (in seconds) for timing in-process work, such as parsing:
+PROCESSING_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+def escape(value):
+    """
+    Escape the given label value for the text exposition format.
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()):
+    """
+    Return the given label names and values, followed by the given extra (name, value) pairs, as
+    a label set in the text exposition format (or an empty string if there are no labels).
+    """
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    A distribution of observed values (typically durations, in seconds), counted in cumulative
+    buckets, along with their count and sum. A histogram has a name, help text, and a set of labels,
+    and keeps a separate distribution for each distinct combination of label values that it is
+    updated with. If the histogram has a timing name, durations that are observed while handling a
+    request are also added to that request's Timings under that name.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=REQUEST_BUCKETS, timing=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.timing = timing
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects the labels {self.labelnames}, not {labels}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def observe(self, value, **labels):
+        if self.timing:
+            timings = current_timings()
+            if timings is not None:
+                timings.add(self.timing, value)
+        key = self._key(labels)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = {"counts": [0] * len(self.buckets), "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    child["counts"][i] += 1
+            child["sum"] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        A context manager that observes the time taken to run its block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        """
+        Return the lines of the text exposition format for the current values of this histogram.
+        """
+        with self._lock:
+            children = sorted(
+                (key, list(child["counts"]), child["sum"]) for key, child in self._children.items()
+            )
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, counts, total in children:
+            for bound, count in zip(self.buckets, counts):
+                labels = format_labels(self.labelnames, key, [("le", format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+
+class Registry:
+    """
+    A collection of metrics, together with collector functions that report values (such as the
+    statistics of caches) which are only computed when the metrics are scraped. A collector
+    returns a list of (name, type, help, labels, value) tuples, where labels is a dictionary.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def histogram(self, name, documentation, labelnames=(), buckets=REQUEST_BUCKETS, timing=None):
+        return self.register(Histogram(name, documentation, labelnames, buckets, timing))
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self._collectors.append(collector)
+
+    def render(self):
+        """
+        Return the current values of every metric in the text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+
+        collected = {}
+        for collector in self._collectors:
+            for name, metric_type, documentation, labels, value in collector():
+                entry = collected.setdefault(name, (metric_type, documentation, []))
+                entry[2].append((labels, value))
+        for name, (metric_type, documentation, values) in collected.items():
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+            for labels, value in values:
+                labels = format_labels(list(labels), list(labels.values()))
+                lines.append(f"{name}{labels} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Timings:
+    """
+    The time spent on each kind of work (e.g. 'github' or 'render') while handling a single request,
+    which is reported to the browser in the request's Server-Timing header, where it is shown by the
+    browser's developer tools. Time may also be added by other threads working on the request's
+    behalf; since these run concurrently, the times reported can add up to more than the total.
+    """
+
+    # The order in which kinds of work are reported; any others are reported after these:
+    order = ["db", "github", "parse", "validate", "render"]
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, count = self._totals.get(name, (0.0, 0))
+            self._totals[name] = (total + seconds, count + 1)
+
+    @contextmanager
+    def time(self, name):
+        """
+        A context manager that adds the time taken to run its block under the given name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def header(self, extra=()):
+        """
+        Return the value of the Server-Timing header describing these timings, the total time since
+        they were started, and the given extra (name, description) entries.
+        """
+        with self._lock:
+            totals = dict(self._totals)
+        names = [n for n in self.order if n in totals]
+        names += sorted(n for n in totals if n not in self.order)
+        entries = []
+        for name in names:
+            total, count = totals[name]
+            calls = "call" if count == 1 else "calls"
+            entries.append(f'{name};dur={total * 1000:.1f};desc="{count} {calls}"')
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        entries += [f'{name};desc="{escape(description)}"' for name, description in extra]
+        return ", ".join(entries)
+
+
+def current_timings():
+    """
+    Return the Timings of the request being handled by this thread, or None if there is none.
+    """
+    return g.get("timings") if has_app_context() else None
+
+
+# Rules for reducing the endpoints of the GitHub REST API that the editor calls to the templates
+# they are instances of, so that latencies can be aggregated by the kind of call being made:
+GITHUB_ENDPOINT_TEMPLATES = [
+    (re.compile(r"^/repos/[^/]+/[^/]+/contents/.*$"), "/repos/{owner}/{repo}/contents/{path}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/commits/[^/]+$"), "/repos/{owner}/{repo}/commits/{ref}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/issues/\d+$"), "/repos/{owner}/{repo}/issues/{number}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+/git/ref/.*$"), "/repos/{owner}/{repo}/git/ref/{ref}"),
+    (re.compile(r"^/repos/[^/]+/[^/]+(/.*)?$"), "/repos/{owner}/{repo}"),
+]
+
+
+def github_endpoint_template(endpoint):
+    """
+    Return the template of the given GitHub REST API endpoint, e.g.
+    '/repos/{owner}/{repo}/contents/{path}' for '/repos/OBOFoundry/purl.obolibrary.org/contents/x'.
+    """
+    endpoint = "/" + endpoint.lstrip("/")
+    for pattern, template in GITHUB_ENDPOINT_TEMPLATES:
+        m = pattern.match(endpoint)
+        if m:
+            # Keep the fixed part of the path of other repository endpoints, e.g. /git/trees:
+            suffix = m.group(1) if m.groups() and m.group(1) else ""
+            return template + re.sub(r"/\d+(?=/|$)", "/{number}", suffix)
+    return re.sub(r"/\d+(?=/|$)", "/{number}", endpoint)
+
+
+# The registry of all of the editor's metrics, and the metrics themselves:
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "editor_http_request_duration_seconds",
+    "Time taken to handle requests to the editor, by Flask endpoint.",
+    ["endpoint", "method", "status"],
+)
+github_request_seconds = registry.histogram(
+    "editor_github_request_duration_seconds",
+    "Time taken by calls to the GitHub REST API, by endpoint template. Calls answered from the "
+    "cache without contacting GitHub have the source 'cache'.",
+    ["endpoint", "method", "status", "source"],
+    timing="github",
+)
+yaml_parse_seconds = registry.histogram(
+    "editor_yaml_parse_duration_seconds",
+    "Time taken to parse YAML, by loader.",
+    ["loader"],
+    buckets=PROCESSING_BUCKETS,
+    timing="parse",
+)
+schema_validation_seconds = registry.histogram(
+    "editor_schema_validation_duration_seconds",
+    "Time taken to validate configurations against their JSON schema, by editor type.",
+    ["editor_type"],
+    buckets=PROCESSING_BUCKETS,
+    timing="validate",
+)
+template_render_seconds = registry.histogram(
+    "editor_template_render_duration_seconds",
+    "Time taken to render Jinja2 templates, by template.",
+    ["template"],
+    buckets=PROCESSING_BUCKETS,
+    timing="render",
+)
+
+
+def cache_samples(cache_name, stats, hit_keys=("hits",), miss_keys=("misses",)):
+    """
+    Return collector samples describing a cache with the given name and statistics: its number of
+    entries, its hits and misses, and its hit ratio.
+    """
+    hits = sum(stats[key] for key in hit_keys)
+    misses = sum(stats[key] for key in miss_keys)
+    labels = {"cache": cache_name}
+    return [
+        (
+            "editor_cache_entries",
+            "gauge",
+            "The number of entries in each cache.",
+            labels,
+            stats["entries"],
+        ),
+        (
+            "editor_cache_hits_total",
+            "counter",
+            "The number of lookups answered by each cache.",
+            labels,
+            hits,
+        ),
+        (
+            "editor_cache_misses_total",
+            "counter",
+            "The number of lookups missed by each cache.",
+            labels,
+            misses,
+        ),
+        (
+            "editor_cache_hit_ratio",
+            "gauge",
+            "The proportion of lookups answered by each cache.",
+            labels,
+            hits / (hits + misses) if hits + misses else 0.0,
+        ),
+    ]
+
+
+def observe_github_call(method, endpoint, response, elapsed, source):
+    """
+    Record a call to the GitHub REST API; see GitHubClient.
+    """
+    github_request_seconds.observe(
+        elapsed,
+        endpoint=github_endpoint_template(endpoint),
+        method=method,
+        status=response.status_code,
+        source=source,
+    )
+
+
+def instrument_app(app):
+    """
+    Time every request handled by the given Flask application, and every template it renders.
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_response_status(response):
+        g.response_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def observe_request(exc):
+        started = g.pop("request_started", None)
+        if started is None:
+            return
+        http_request_seconds.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or "none",
+            method=request.method,
+            status=g.pop("response_status", 500),
+        )
+
+    def start_template_timer(sender, template, context, **extra):
+        g.setdefault("template_starts", []).append(time.perf_counter())
+
+    def observe_template(sender, template, context, **extra):
+        starts = g.get("template_starts")
+        if starts:
+            template_render_seconds.observe(
+                time.perf_counter() - starts.pop(), template=template.name or "none"
+            )
+
+    before_render_template.connect(start_template_timer, app, weak=False)
+    template_rendered.connect(observe_template, app, weak=False)
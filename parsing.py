@@ -0,0 +1,87 @@
+import metrics
+import threading
+
+from io import StringIO
+from ruamel.yaml import YAML
+from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+# ruamel.yaml's YAML objects keep the state of the document being loaded or dumped, so they must not
+# be shared between threads. Each thread instead gets its own instances, which are created the
+# first time that thread needs them and then reused for all of its later calls:
+_local = threading.local()
+
+
+def _instance(typ):
+    """
+    Return this thread's YAML instance of the given type ('safe' or 'rt').
+    """
+    instances = getattr(_local, "instances", None)
+    if instances is None:
+        instances = _local.instances = {}
+    instance = instances.get(typ)
+    if instance is None:
+        instance = instances[typ] = YAML(typ=typ)
+    return instance
+
+
+def load(text):
+    """
+    Parse the given YAML text into plain Python dictionaries, lists and scalars. This uses the safe
+    loader, which is backed by libyaml's C parser when ruamel.yaml.clib is available, and is much
+    faster than the round-trip loader. Use load_with_positions() when line and column information
+    is needed.
+    """
+    with metrics.yaml_parse_seconds.time(loader="safe"):
+        return _instance("safe").load(text)
+
+
+def load_with_positions(text):
+    """
+    Parse the given YAML text using the round-trip loader, and return a tuple containing the
+    parsed document and an index of the positions within the text of its contents (see
+    position_index()).
+    """
+    with metrics.yaml_parse_seconds.time(loader="rt"):
+        document = _instance("rt").load(text)
+        return document, position_index(document)
+
+
+def position_index(document):
+    """
+    Return a dictionary from the path of every mapping key and sequence item in the given document,
+    as loaded by the round-trip loader, to its zero-based (line, column) in the source text. A path
+    is a tuple of keys and indices, in the form used by jsonschema's `absolute_path`; for example,
+    the second item of the list under the 'products' key has the path ('products', 1).
+    """
+    index = {}
+    seen = set()
+    stack = [((), document)]
+    while stack:
+        path, node = stack.pop()
+        if isinstance(node, CommentedMap):
+            children = list(node.items())
+        elif isinstance(node, CommentedSeq):
+            children = list(enumerate(node))
+        else:
+            continue
+        # Aliased nodes are only indexed where they are first defined, which also keeps recursive
+        # aliases from being followed forever:
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        for key, value in children:
+            pos = node.lc.data.get(key)
+            if pos is not None:
+                index[path + (key,)] = (pos[0], pos[1])
+        # Visit the children in the order in which they appear in the source:
+        stack.extend(reversed([(path + (key,), value) for key, value in children]))
+    return index
+
+
+def dump(data):
+    """
+    Return the given data serialised as block-style YAML.
+    """
+    stream = StringIO()
+    _instance("rt").dump(data, stream)
+    return stream.getvalue()
@@ -0,0 +1,64 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import threading
+
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# The number of functions to include in the text summary of a profile:
+SUMMARY_LENGTH = 40
+
+
+class RequestProfiler:
+    """
+    Runs cProfile on individual requests, on demand, and saves each profile to the given directory
+    (from which it can be loaded with pstats, or viewed with a tool such as snakeviz). Only one
+    request is profiled at a time; requests to profile another request in the meantime are ignored.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        """
+        Start profiling the calling thread, returning False if another request is being profiled.
+        """
+        if not self._lock.acquire(blocking=False):
+            logger.info("Not profiling this request since another one is already being profiled")
+            return False
+        self._local.profile = cProfile.Profile()
+        self._local.profile.enable()
+        return True
+
+    def stop(self, name):
+        """
+        Stop profiling the calling thread, and save the profile to a file named after the given
+        name (e.g. the request's endpoint) and the current time. Returns the path of the file and a
+        text summary of the functions with the highest cumulative times, or None if this thread is
+        not being profiled.
+        """
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            return None
+        try:
+            profile.disable()
+            self._local.profile = None
+            os.makedirs(self.directory, exist_ok=True)
+            filename = f"{datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')}-{name}.prof"
+            path = os.path.join(self.directory, re.sub(r"[^\w.-]", "_", filename))
+            profile.dump_stats(path)
+        finally:
+            self._lock.release()
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats("cumulative").print_stats(SUMMARY_LENGTH)
+        logger.info(f"Saved profile of {name} to {path}")
+        return path, summary.getvalue()
@@ -1,19 +1,37 @@
 #!/usr/bin/env python3
 
+import assets
 import base64
 import functools
+import hashlib
+import hmac
 import json
-import jsonschema
 import logging
+import metrics
+import os
+import parsing
+import posixpath
+import profiling
 import re
 import requests
+import threading
+import time
+import uuid
+import validation
+import webhooks
 
-from io import StringIO
-from ruamel.yaml import YAML
 from ruamel.yaml.error import YAMLError
-from ruamel.yaml.constructor import DuplicateKeyError
 
-from datetime import datetime
+from cache import LRUCache, StaleWhileRevalidateCache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from github_client import (
+    ConditionalRequestCache,
+    GitHubClient,
+    RateLimitGovernor,
+    token_scope,
+)
+from metadata import MetadataRefresher
 from flask import (
     Flask,
     jsonify,
@@ -21,18 +39,33 @@ from flask import (
     request,
     Response,
     g,
-    send_from_directory,
     session,
     redirect,
     url_for,
 )
-from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy import (
+    create_engine,
+    delete,
+    event,
+    func,
+    inspect,
+    select,
+    text,
+    update,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.ext.declarative import declarative_base
-from urllib.parse import parse_qs, urlencode
-from urllib.request import urlopen
+from sqlalchemy.pool import StaticPool
+from urllib.parse import parse_qs
 
-yaml = YAML()  # For parsing yaml files
 
 # To run in development mode, do:
 # export FLASK_APP=server.py
@@ -52,6 +85,12 @@ app = Flask(__name__)
 app.config.from_object("config")
 app.secret_key = app.config["FLASK_SECRET_KEY"]
 
+# Time every request and every template rendered, for the /metrics endpoint:
+metrics.instrument_app(app)
+
+# Profiles requests on demand for administrators (see before_request()):
+profiler = profiling.RequestProfiler(app.config["PROFILE_DIR"])
+
 # Initialize the logger:
 logging.basicConfig(format=app.config["LOGGING_CONFIG"])
 logger = logging.getLogger(__name__)
@@ -60,14 +99,64 @@ logger.setLevel(app.config["LOG_LEVEL"])
 # The filesystem directory where this script is running from:
 pwd = app.config["PWD"]
 
+# The static files used by the pages of the editor, and the bundles of them used by the editor
+# page, which templates refer to using asset_url(). Bundles are rebuilt if their files have changed:
+static_assets = assets.Assets(
+    pwd,
+    files=["editor.js", "editor.css", "new_foundry_reg.js"],
+    dirs=["3pp"],
+    bundles=app.config["ASSET_BUNDLES"],
+    build_dir=app.config["ASSET_BUILD_DIR"],
+)
+static_assets.build()
+app.add_template_global(static_assets.url, "asset_url")
+
+
+def create_db_engine(uri):
+    """
+    Create the engine used to connect to the database at the given URI, with a pool of connections
+    shared by the threads serving requests and the submission workers. SQLite databases use
+    write-ahead logging, so that reading the database (e.g. to look up a user) neither waits for
+    nor blocks a write to it, even by another process; a write waits up to DATABASE_BUSY_TIMEOUT
+    seconds for any other write to finish.
+    """
+    pool_options = {
+        "pool_size": app.config["DATABASE_POOL_SIZE"],
+        "max_overflow": app.config["DATABASE_MAX_OVERFLOW"],
+    }
+    url = make_url(uri)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(uri, pool_pre_ping=True, **pool_options)
+    if url.database in (None, "", ":memory:"):
+        # An in-memory database only exists for as long as its one connection:
+        return create_engine(uri, poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    sqlite_engine = create_engine(
+        uri,
+        connect_args={"check_same_thread": False, "timeout": app.config["DATABASE_BUSY_TIMEOUT"]},
+        **pool_options,
+    )
+
+    @event.listens_for(sqlite_engine, "connect")
+    def configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # With write-ahead logging, this is still safe from corruption, and commits are faster:
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return sqlite_engine
+
+
 # Setup sqlalchemy to manage the database of logged in users:
-engine = create_engine(app.config["DATABASE_URI"])
+engine = create_db_engine(app.config["DATABASE_URI"])
 db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 Base = declarative_base()
 Base.query = db_session.query_property()
 
-# Boolean for managing current running state feature (show/hide in-development features)
-dev = app.config["ENV"] == "development"
+# Boolean for managing current running state feature (show/hide in-development features). Flask no
+# longer sets app.config["ENV"] (as of 2.3), so FLASK_ENV is read directly:
+dev = os.getenv("FLASK_ENV", "production") == "development"
 
 
 # Utility dictionary for linking editor types to repositories and content directories
@@ -83,44 +172,65 @@ editor_types = {
 }
 
 
-# Retrieve the ontology metadata:
-try:
-    ontology_md = urlopen(app.config["ONTOLOGY_METADATA_URL"])
-    if ontology_md.getcode() == 200:
-        ontology_md = yaml.load(ontology_md.read())["ontologies"]
-except Exception as e:
-    logger.error(f"Could not retrieve ontology metadata: {e}")
-    ontology_md = {}
-
-
-# Load the PURL validation schema:
-try:
-    purl_schema_text = urlopen(app.config["PURL_SCHEMA"])
-    if purl_schema_text.getcode() == 200:
-        purl_schema = json.load(purl_schema_text)
-except Exception as e:
-    logger.error(f"Could not retrieve PURL schema: {e}")
-    purl_schema = {}
-
-# Load the REGISTRY validation schema:
-try:
-    registry_schema_text = urlopen(app.config["REGISTRY_SCHEMA"])
-    if registry_schema_text.getcode() == 200:
-        registry_schema = json.load(registry_schema_text)
-except Exception as e:
-    logger.error(f"Could not retrieve REGISTRY schema: {e}")
-    registry_schema = {}
-
-
 ## GitHub Configuration and Authentication
 
-# URLs and functions used for communicating with GitHub:
+# The headers sent with every call to the GitHub REST API (whose URL is set in config.py):
 GITHUB_DEFAULT_API_HEADERS = {
     "Accept": "application/vnd.github.v3+json",
     "User-Agent": "purl-editor/1.0",
 }
-GITHUB_API_URL = "https://api.github.com"
-GITHUB_OAUTH_URL = "https://github.com/login/oauth"
+
+# The client through which all communication with GitHub happens. It keeps a pool of keep-alive
+# connections to GitHub that is shared by all of the requests served by the application, and
+# caches the responses to GET requests so that they can be revalidated with conditional requests.
+# It also keeps track of each user's rate limit budget, and falls back to the cached responses
+# when that budget is running low.
+github_cache = ConditionalRequestCache(app.config["GITHUB_CACHE_SIZE"])
+github_governor = RateLimitGovernor(reserve=app.config["GITHUB_RATE_LIMIT_RESERVE"])
+github = GitHubClient(
+    app.config["GITHUB_API_URL"],
+    app.config["GITHUB_OAUTH_URL"],
+    headers=GITHUB_DEFAULT_API_HEADERS,
+    pool_size=app.config["GITHUB_POOL_SIZE"],
+    connect_timeout=app.config["GITHUB_CONNECT_TIMEOUT"],
+    read_timeout=app.config["GITHUB_READ_TIMEOUT"],
+    max_retries=app.config["GITHUB_MAX_RETRIES"],
+    backoff_factor=app.config["GITHUB_RETRY_BACKOFF"],
+    cache=github_cache,
+    governor=github_governor,
+    observer=metrics.observe_github_call,
+)
+
+# Threads used to make independent calls to GitHub concurrently, on behalf of a single request:
+github_executor = ThreadPoolExecutor(app.config["GITHUB_POOL_SIZE"], thread_name_prefix="github")
+
+# Retrieve the ontology metadata and the PURL and REGISTRY validation schemas, and keep them up to
+# date in the background. Request handlers should always read these through metadata.snapshot.
+metadata = MetadataRefresher(
+    github,
+    {
+        "ontology_md": app.config["ONTOLOGY_METADATA_URL"],
+        "purl_schema": app.config["PURL_SCHEMA"],
+        "registry_schema": app.config["REGISTRY_SCHEMA"],
+    },
+    interval=app.config["METADATA_REFRESH_INTERVAL"],
+)
+metadata.refresh()
+metadata.start()
+
+# Compiled validators for the PURL and REGISTRY schemas, rebuilt whenever the schemas change:
+validators = validation.ValidatorCache()
+
+# The results of recent validations, keyed by the type of the config, the version of its schema, and
+# a hash of its code, so that code which has already been validated need not be validated again:
+validation_cache = LRUCache(
+    app.config["VALIDATION_CACHE_SIZE"], ttl=app.config["VALIDATION_CACHE_TTL"]
+)
+
+# The identities of recently seen users, keyed by the user id in their (signed) session, so that
+# requests, including those for the editor's static files, need not read the users database (see
+# Identity). Entries are removed when their users log out:
+identity_cache = LRUCache(app.config["IDENTITY_CACHE_SIZE"], ttl=app.config["IDENTITY_CACHE_TTL"])
 
 
 def github_authorize(params):
@@ -128,7 +238,7 @@ def github_authorize(params):
     Call the /authorize endpoint of GitHub's authorization API to authenticate using the given
     authentication parameters and return GitHub's response.
     """
-    response = requests.get(GITHUB_OAUTH_URL + "/authorize", params)
+    response = github.oauth("GET", "/authorize", params)
     if not response.ok:
         response.raise_for_status()
     return response
@@ -139,69 +249,173 @@ def github_authorize_token(params):
     Call the /access_token endpoint of GitHub's authorization API to authenticate using the given
     authentication parameters and return GitHub's response, which should contain an access token.
     """
-    response = requests.post(GITHUB_OAUTH_URL + "/access_token", params)
+    response = github.oauth("POST", "/access_token", params)
     if not response.ok:
         response.raise_for_status()
     return response
 
 
-def github_call(method, endpoint, params={}):
+def github_call(method, endpoint, params={}, access_token=None, urgent=False):
     """
     Call the GitHub REST API at the given endpoint using the given method and passing the given
-    params.
+    params. Unless an access token is given explicitly (which is needed when calling GitHub from
+    outside of a request), the token of the user in the global application context is used. Unless
+    the call is urgent, a GET may be answered with cached data when the user's rate limit budget is
+    running low.
     """
     method = method.casefold()
     if method not in ["get", "post", "put"]:
         logger.error(f"Unsupported API method: {method}")
         return {}
 
-    access_token = g.user.github_access_token
+    if access_token is None:
+        access_token = g.user.github_access_token
     if not access_token:
         logger.error("No token found in the global application context.")
         return {}
 
-    api_headers = GITHUB_DEFAULT_API_HEADERS
-    api_headers["Authorization"] = f"token {access_token}"
-    if not endpoint.startswith("/"):
-        endpoint = "/" + endpoint
-
-    fargs = {"url": GITHUB_API_URL + endpoint, "headers": api_headers, "json": params}
-    if method == "get":
-        # GET parameters must go in URL - https://developer.github.com/v3/#parameters
-        if len(params) > 0:
-            fargs["url"] = fargs["url"] + "?" + urlencode(params)
-        response = requests.get(**fargs)
-    elif method == "post":
-        response = requests.post(**fargs)
-    elif method == "put":
-        response = requests.put(**fargs)
-
+    response = github.api(method, endpoint, access_token, params, urgent)
     if not response.ok:
         if response.status_code == 403:
             logger.error(
-                f"Received 403 Forbidden from {method} request to endpoint {endpoint}"
-                "with params {params}"
+                f"Received 403 Forbidden from {method} request to endpoint {endpoint} "
+                f"with params {params}"
             )
         response.raise_for_status()
     return response.json()
 
 
+def github_call_async(method, endpoint, params={}, access_token=None):
+    """
+    Start a call to the GitHub REST API, as made by github_call(), in one of the threads of the
+    github_executor, and return a Future for its result. Independent calls can be made concurrently
+    by starting all of them before waiting for any of their results. The access token of the user
+    in the global application context, if needed, is looked up here since the executor's threads
+    have no application context. Note that this must not be called from the executor's threads.
+    """
+    if access_token is None:
+        access_token = g.user.github_access_token
+    # The executor's threads cannot see the request's timings either, so time the call here:
+    timings = metrics.current_timings()
+
+    def call():
+        if timings is None:
+            return github_call(method, endpoint, params, access_token)
+        with timings.time("github"):
+            return github_call(method, endpoint, params, access_token)
+
+    return github_executor.submit(call)
+
+
+def new_ontology_issues():
+    """
+    Return a dictionary from number to title of the open new ontology requests in the issue tracker
+    of the registry repository.
+    """
+    issues = {}
+    issue_list = github_call(
+        "GET",
+        f'repos/{app.config["GITHUB_ORG"]}/{editor_types["registry"]["repo"]}/issues',
+        params={"state": "open", "labels": "new ontology"},
+    )
+    for issue in issue_list:
+        number = issue["number"]
+        title = issue["title"]
+        logger.debug(f"Got issue: {number}, {title}")
+        issues[number] = title
+    return issues
+
+
 class User(Base):
     """
-    Saved information for users that have been authenticated to the metadata editor.
-    Note that this table preserves historical data (user records are not deleted
-    when a user logs out)
+    Saved information for users that have been authenticated to the metadata editor. Each person
+    has a single record, identified by their github_id, which holds the access token from their
+    latest login (see save_user()). Records are not deleted when a user logs out, but only once
+    the user has not logged in for USER_RETENTION_DAYS (see compact_db()). The id of a deleted
+    record is never given to another one, since sessions and submission jobs may still refer to it.
     """
 
     __tablename__ = "users"
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True)
-    github_access_token = Column(String(255))
-    github_id = Column(Integer)
+    github_access_token = Column(String(255), index=True)
+    github_id = Column(Integer, index=True, unique=True)
     github_login = Column(String(255))
+    last_login = Column(DateTime)
 
     def __init__(self, github_access_token):
         self.github_access_token = github_access_token
+        self.last_login = datetime.utcnow()
+
+
+class Identity:
+    """
+    The identity of an authenticated user, as kept in the identity_cache and in the global
+    application context: a copy of their User record, which, unlike the record itself, is not tied
+    to any database session, along with their GitHub profile (the response to GET /user), which is
+    retrieved when they log in.
+    """
+
+    def __init__(self, user, profile=None):
+        self.id = user.id
+        self.github_access_token = user.github_access_token
+        self.github_id = user.github_id
+        self.github_login = user.github_login
+        self.profile = profile
+
+
+class Job(Base):
+    """
+    A request to submit a pull request to github, which is carried out in the background by the
+    submission workers (see run_job()). The payload of a job is a JSON object containing the repo,
+    the name of the new branch, the files (a dictionary from path to contents) to commit to it, and
+    the commit_msg, draft and long_msg of the PR. The result of a finished job is a JSON object
+    containing either the pr_info returned by github or an error message.
+    """
+
+    __tablename__ = "jobs"
+
+    # The stages that a job goes through, and their descriptions for users:
+    stages = {
+        "queued": "Waiting to be submitted",
+        "committing": "Committing changes",
+        "creating_pr": "Creating pull request",
+        "done": "Submitted",
+        "failed": "Submission failed",
+    }
+    finished = ["done", "failed"]
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer)
+    status = Column(String(16))
+    payload = Column(Text)
+    result = Column(Text)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    # Incremented on every update, so that a job is never processed by two workers at once (an
+    # update based on an outdated version of the job raises a StaleDataError):
+    version = Column(Integer, nullable=False)
+
+    __mapper_args__ = {"version_id_col": version}
+
+    def __init__(self, user_id, payload):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.status = "queued"
+        self.payload = json.dumps(payload)
+        self.created_at = self.updated_at = datetime.utcnow()
+
+    def describe(self):
+        """
+        Return a dictionary describing the current state of this job to its user.
+        """
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "description": self.stages[self.status],
+            **json.loads(self.result or "{}"),
+        }
 
 
 @app.before_request
@@ -213,8 +427,31 @@ def before_request():
     # already contains user information, use that to populate the global context, otherwise
     # leave it unset.
     g.user = None
+    g.timings = metrics.Timings()
+    # Static assets are served to anybody, without looking up the user:
+    if request.endpoint in ("send_asset", "send_editor_page"):
+        return
     if "user_id" in session:
-        g.user = User.query.get(session["user_id"])
+        g.user = identity_cache.get(session["user_id"])
+        if g.user is None:
+            with g.timings.time("db"):
+                user = User.query.get(session["user_id"])
+            if user is not None:
+                g.user = Identity(user)
+                identity_cache.set(user.id, g.user)
+        # The session is only valid for the GitHub account that it was created for, in case its user
+        # id has somehow come to belong to somebody else:
+        if g.user is not None and g.user.github_id != session.get("github_id"):
+            logger.warning(f"Session for user {session['user_id']} has the wrong github_id")
+            g.user = None
+            session.pop("user_id")
+            session.pop("github_id", None)
+
+    # Profile this request if an administrator has asked for it:
+    g.profiling = None
+    if request.args.get("profile") and g.user and g.user.github_login in app.config["ADMIN_USERS"]:
+        if profiler.start():
+            g.profiling = request.args["profile"]
 
 
 @app.after_request
@@ -224,6 +461,17 @@ def after_request(response):
     """
     # Clean up the database session:
     db_session.remove()
+
+    extra = []
+    if g.get("profiling"):
+        path, summary = profiler.stop(request.endpoint or "none")
+        extra.append(("profile", os.path.basename(path)))
+        if g.profiling == "text":
+            response = Response(summary, mimetype="text/plain")
+
+    # Report where the time taken to handle the request went, for the browser's developer tools:
+    if "timings" in g:
+        response.headers["Server-Timing"] = g.timings.header(extra)
     return response
 
 
@@ -285,28 +533,49 @@ def github_callback():
         # the log in the fetch_access_token() function above.
         return redirect(next_url)
 
-    # Check to see if we already have the user corresponding to this access token in the db, and add
-    # her if we don't:
-    user = User.query.filter_by(github_access_token=access_token).first()
-    if user is None:
-        user = User(access_token)
-        db_session.add(user)
-
-    # Add the user to the global application context:
-    g.user = user
+    # Get some other useful information about the user, and record it along with their new token:
+    github_user = github_call("GET", "/user", access_token=access_token)
+    user = save_user(access_token, github_user)
 
-    # Get some other useful information about the user:
-    github_user = github_call("GET", "/user")
-    g.user.github_id = github_user["id"]
-    g.user.github_login = github_user["login"]
+    # Add the user to the global application context, and remember their identity and profile for
+    # their later requests:
+    g.user = Identity(user, profile=github_user)
+    identity_cache.set(user.id, g.user)
 
-    db_session.commit()
-
-    # Add the user's id to the session and then redirect to the requested URL:
+    # Add the user's id, and their GitHub id to bind the session to them, to the session and then
+    # redirect to the requested URL:
     session["user_id"] = user.id
+    session["github_id"] = user.github_id
     return redirect(next_url)
 
 
+def save_user(access_token, github_user):
+    """
+    Record the given access token and GitHub profile of a user who has just logged in in their
+    User record, which is added if they do not have one yet, and return the record.
+    """
+
+    def upsert():
+        user = User.query.filter_by(github_id=github_user["id"]).first()
+        if user is None:
+            user = User(access_token)
+            user.github_id = github_user["id"]
+            db_session.add(user)
+        user.github_access_token = access_token
+        user.github_login = github_user["login"]
+        user.last_login = datetime.utcnow()
+        db_session.commit()
+        return user
+
+    try:
+        return upsert()
+    except IntegrityError:
+        # The same person has logged in elsewhere at the same time, and their record was added
+        # there first:
+        db_session.rollback()
+        return upsert()
+
+
 @app.route("/login")
 def login():
     """
@@ -317,7 +586,8 @@ def login():
     # happen, for example, if the users db gets deleted but the user's browser session still has
     # the user's id in it.
     if session.get("user_id") is not None:
-        session.pop("user_id")
+        identity_cache.pop(session.pop("user_id"))
+    session.pop("github_id", None)
 
     params = {
         "client_id": app.config["GITHUB_CLIENT_ID"],
@@ -362,104 +632,244 @@ def logout():
     De-authenticate the user
     """
     # Simply pop the user id from the session cookie, which will be enough to signal to the server
-    # that the user is not authenticated.
-    session.pop("user_id", None)
+    # that the user is not authenticated, and forget the user's identity:
+    identity_cache.pop(session.pop("user_id", None))
+    session.pop("github_id", None)
     return redirect(url_for("logged_out"))
 
 
 ### Main Application
 
-@app.route("/")
-@verify_logged_in
-def index():
+
+def load_config_listing(access_token):
     """
-    Renders the index page of the application
+    Fetch the lists of PURL and registry config files from GitHub, join them with the ontology
+    metadata, and return the resulting records sorted by ontology id, along with the HTML table
+    rows that display them on the index page.
     """
-    # Get all of the available config files to edit:
-    purl_configs = github_call(
+    # Get all of the available PURL and registry config files to edit, concurrently:
+    purl_configs = github_call_async(
         "GET",
         f'repos/{app.config["GITHUB_ORG"]}/{editor_types["purl"]["repo"]}/'
         f'contents/{editor_types["purl"]["dir"]}',
+        access_token=access_token,
     )
-    if not purl_configs:
-        raise Exception("Could not get contents of the purl config directory")
-
-    # Get all of the available registry config files to edit:
-    registry_configs = github_call(
+    registry_configs = github_call_async(
         "GET",
         f'repos/{app.config["GITHUB_ORG"]}/{editor_types["registry"]["repo"]}/'
         f'contents/{editor_types["registry"]["dir"]}',
+        access_token=access_token,
     )
+    purl_configs = purl_configs.result()
+    if not purl_configs:
+        raise Exception("Could not get contents of the purl config directory")
+    registry_configs = registry_configs.result()
     if not registry_configs:
         raise Exception("Could not get contents of the registry config directory")
 
     # Add the title, url and description for each config to the records that will be rendered.
     # This information is found in the ontology metadata.
-    configs = []
+    purl_filenames = {}
     for purl_config in purl_configs:
         config_id = purl_config["name"].casefold().replace(app.config["YAML_EXT"], "")
         # We skip the OBO idspace:
         if config_id != "obo":
-            config_title = [o["title"] for o in ontology_md if o["id"] == config_id]
-            config_title = config_title.pop() if config_title else ""
-            config_description = [
-                o["description"]
-                for o in ontology_md
-                if o["id"] == config_id and "description" in o
-            ]
-            config_description = config_description.pop() if config_description else ""
-            if registry_configs:
-                registries_for_idspace = [
-                    x
-                    for x in registry_configs
-                    if x["name"] == config_id + app.config["MARKDOWN_EXT"]
-                ]
-
-            configs.append(
-                {
-                    "id": config_id,
-                    "purl_filename": purl_config["name"],
-                    "registry_filename": registries_for_idspace[0]["name"]
-                    if len(registries_for_idspace) > 0
-                    else None,
-                    "title": config_title,
-                    "description": config_description,
-                }
-            )
+            purl_filenames[config_id] = purl_config["name"]
 
+    registry_filenames = {}
     for registry_config in registry_configs:
         config_id = (
             registry_config["name"].casefold().replace(app.config["MARKDOWN_EXT"], "")
         )
-        if config_id not in [c["id"] for c in configs]:
-            config_title = [o["title"] for o in ontology_md if o["id"] == config_id]
-            config_title = config_title.pop() if config_title else ""
-            config_description = [
-                o["description"]
-                for o in ontology_md
-                if o["id"] == config_id and "description" in o
-            ]
-            config_description = config_description.pop() if config_description else ""
-            configs.append(
-                {
-                    "id": config_id,
-                    "purl_filename": None,
-                    "registry_filename": registry_config["name"],
-                    "title": config_title,
-                    "description": config_description,
-                }
-            )
+        registry_filenames[config_id] = registry_config["name"]
 
-    return render_template("index.jinja2", configs=configs, login=g.user.github_login)
+    configs = metadata.snapshot.join_configs(purl_filenames, registry_filenames)
+    configs = sorted(configs, key=lambda c: c["id"])
 
+    # Rendering may happen in a background thread, outside of any request:
+    with app.app_context():
+        table = render_template("index_table.jinja2", configs=configs)
+    return {"configs": configs, "table": table}
 
-@app.route("/<path:path>")
+
+# The cached listing of config files shown on the index page. The listing only changes when a PR
+# is merged into one of the repositories, so it is served from the cache, and refreshed in the
+# background once it is older than INDEX_CACHE_TTL seconds.
+index_cache = StaleWhileRevalidateCache(
+    app.config["INDEX_CACHE_TTL"], app.config["INDEX_CACHE_MAX_STALE"]
+)
+
+
+@app.route("/rate_limit")
 @verify_logged_in
+def rate_limit():
+    """
+    Returns the current user's GitHub API rate limit budget, as described by
+    RateLimitGovernor.budget(), so that the user can be warned when it is running low.
+    """
+    return jsonify(github_governor.budget(token_scope(g.user.github_access_token)))
+
+
+@app.route("/")
+@verify_logged_in
+def index():
+    """
+    Renders the index page of the application
+    """
+    access_token = g.user.github_access_token
+    listing = index_cache.get(
+        "config_listing",
+        lambda: load_config_listing(access_token),
+        version=metadata.snapshot.version,
+    )
+    return render_template(
+        "index.jinja2",
+        configs=listing["configs"],
+        table=listing["table"],
+        login=g.user.github_login,
+    )
+
+
+## GitHub Webhooks
+
+# The repositories and paths of the files from which the ontology metadata and validation schemas
+# are loaded. A push to any of these files triggers a refresh of the metadata.
+metadata_files = set(
+    location
+    for location in map(webhooks.raw_file_location, metadata.urls.values())
+    if location is not None
+)
+
+
+def invalidate_contents(repo, path, recursive=False):
+    """
+    Invalidate the cached GitHub responses for the given file or directory in the given repository,
+    and optionally for everything within that directory.
+    """
+    endpoint = f"/repos/{repo}/contents/{path}"
+    return github_cache.invalidate(
+        lambda e: e == endpoint or (recursive and e.startswith(endpoint + "/"))
+    )
+
+
+def handle_push(payload):
+    """
+    Invalidate the cached data affected by a push of commits to one of our repositories.
+    """
+    repo = payload["repository"]["full_name"]
+    branch = payload.get("ref", "").replace("refs/heads/", "", 1)
+    paths = webhooks.pushed_files(payload)
+    logger.debug(f"Got push of {len(paths)} changed file(s) to {branch} in {repo}")
+
+    truncated = webhooks.is_truncated(payload)
+
+    if truncated or any((repo, branch, path) in metadata_files for path in paths):
+        logger.info(f"Ontology metadata or schema may have changed in {repo}; refreshing")
+        metadata.trigger()
+
+    # We only ever read configuration files from the default branch:
+    if branch != payload["repository"].get("default_branch", "master"):
+        return
+
+    for editor_type in editor_types.values():
+        if repo != f'{app.config["GITHUB_ORG"]}/{editor_type["repo"]}':
+            continue
+        if truncated:
+            # We can't tell which files were changed, so assume that all of them were:
+            invalidate_contents(repo, editor_type["dir"], recursive=True)
+            index_cache.invalidate(lambda key: True)
+            logger.info(f"Invalidated all cached config files of {repo}")
+            continue
+        changed = [p for p in paths if webhooks.in_directory(p, editor_type["dir"])]
+        if changed:
+            for path in changed:
+                invalidate_contents(repo, path)
+            invalidate_contents(repo, editor_type["dir"])
+            index_cache.invalidate(lambda key: True)
+            logger.info(f"Invalidated cached listing and {len(changed)} file(s) of {repo}")
+
+
+def handle_issues(payload):
+    """
+    Invalidate the cached data affected by an issue being opened, edited, labelled, closed, etc.
+    """
+    repo = payload["repository"]["full_name"]
+    number = payload["issue"]["number"]
+    issues = f"/repos/{repo}/issues"
+    removed = github_cache.invalidate(lambda e: e in [issues, f"{issues}/{number}"])
+    logger.debug(f"Invalidated {removed} cached response(s) for issue {number} in {repo}")
+
+
+def handle_pull_request(payload):
+    """
+    Invalidate the cached data affected by a pull request being merged. Normally the resulting push
+    event takes care of this, but we cannot rely on the webhook being subscribed to both events.
+    """
+    pr = payload["pull_request"]
+    if payload.get("action") != "closed" or not pr.get("merged"):
+        return
+
+    repo = payload["repository"]["full_name"]
+    for editor_type in editor_types.values():
+        if repo == f'{app.config["GITHUB_ORG"]}/{editor_type["repo"]}':
+            invalidate_contents(repo, editor_type["dir"])
+            index_cache.invalidate(lambda key: True)
+            logger.info(f"Invalidated cached listing of {repo} after merge of PR {pr['number']}")
+
+
+webhook_handlers = {
+    "push": handle_push,
+    "issues": handle_issues,
+    "pull_request": handle_pull_request,
+}
+
+
+@app.route("/github_webhook", methods=["POST"])
+def github_webhook():
+    """
+    Receives webhook deliveries from GitHub, which tell us when the contents of the repositories we
+    read from change, so that the corresponding cached data can be invalidated. Deliveries must be
+    signed with the secret configured as GITHUB_WEBHOOK_SECRET.
+    """
+    secret = app.config["GITHUB_WEBHOOK_SECRET"]
+    if not secret:
+        return Response("Webhooks are not enabled", status=404)
+
+    signature = request.headers.get("X-Hub-Signature-256")
+    if not webhooks.verify_signature(secret, request.get_data(), signature):
+        logger.error("Received webhook delivery with an invalid signature")
+        return Response("Invalid signature", status=403)
+
+    event = request.headers.get("X-GitHub-Event")
+    if event == "ping":
+        return Response("pong", status=200)
+    if event not in webhook_handlers:
+        return Response(f"Ignoring unsupported event: {event}", status=202)
+
+    payload = request.get_json(silent=True)
+    if not payload or not webhooks.is_well_formed(event, payload):
+        return Response("Malformed webhook payload", status=400)
+
+    webhook_handlers[event](payload)
+    return Response(status=204)
+
+
+@app.route("/assets/<digest>/<path:path>")
+def send_asset(digest, path):
+    """
+    Route for serving up static files, including third party libraries, by their fingerprinted URLs
+    (see assets.Assets).
+    """
+    return static_assets.send(path, digest)
+
+
+@app.route("/<path:path>")
 def send_editor_page(path):
     """
-    Route for serving up static files, including third party libraries.
+    Route for serving up static files by their plain paths, which must be revalidated before they
+    are reused. Pages should refer to assets by their fingerprinted URLs instead.
     """
-    return send_from_directory(pwd, path, as_attachment=False)
+    return static_assets.send(path)
 
 
 @app.route("/edit_new", methods=["POST"])
@@ -490,8 +900,17 @@ def edit_new():
         return Response("Malformed POST request", status=400)
 
     logger.debug(f"Got editor type: {editor_type}")
+    snapshot = metadata.snapshot
     gHubRegex = r"https?://github\.com/([^/]*)/([^/]*)/?"
     issueDetails = None
+
+    # If the project's GitHub repository is already known, check that it exists while the issue is
+    # being retrieved:
+    repo_check = None
+    if editor_type is None and github_org and github_repo:
+        repo_check = (github_org, github_repo)
+        repo_exists = github_call_async("GET", f"repos/{github_org}/{github_repo}")
+
     if issueNumber:
         # Retrieve all the information from the issue
         # GET /repos/:owner/:repo/issues/:issue_number
@@ -503,7 +922,7 @@ def edit_new():
         )["body"]
         logger.debug(f"Got issue body {issueData}")
         try:
-            issueDetails = yaml.load(issueData)
+            issueDetails = parsing.load(issueData)
             # Remove keys not needed for the registry metadata
             del issueDetails["related_ontologies"]
             del issueDetails["intended_use"]
@@ -591,17 +1010,7 @@ def edit_new():
                 )
 
             else:  # Can't parse this issue with any strategy, something has gone wrong.
-                issues = {}
-                issue_list = github_call(
-                    "GET",
-                    f'repos/{app.config["GITHUB_ORG"]}/{editor_types["registry"]["repo"]}/issues',
-                    params={"state": "open", "labels": "new ontology"},
-                )
-                for issue in issue_list:
-                    number = issue["number"]
-                    title = issue["title"]
-                    logger.debug(f"Got issue: {number}, {title}")
-                    issues[number] = title
+                issues = new_ontology_issues()
                 error_message = format(err)
                 return render_template(
                     "prepare_new_config.jinja2",
@@ -621,21 +1030,12 @@ def edit_new():
 
     if editor_type is None:  # First step
         try:
-            github_call("GET", f"repos/{github_org}/{github_repo}")
+            # The details of the repository may have been taken from the issue:
+            if repo_check != (github_org, github_repo):
+                repo_exists = github_call_async("GET", f"repos/{github_org}/{github_repo}")
+            repo_exists.result()
         except requests.HTTPError:
-            # Get the issuse list again
-            issues = {}
-            issue_list = github_call(
-                "GET",
-                f'repos/{app.config["GITHUB_ORG"]}/{editor_types["registry"]["repo"]}/issues',
-                params={"state": "open", "labels": "new ontology"},
-            )
-            for issue in issue_list:
-                number = issue["number"]
-                title = issue["title"]
-                logger.debug(f"Got issue: {number}, {title}")
-                issues[number] = title
-
+            issues = new_ontology_issues()
             return render_template(
                 "prepare_new_config.jinja2",
                 login=g.user.github_login,
@@ -668,17 +1068,14 @@ def edit_new():
             issueDetails["domain"] = ""
 
         # Generate text for initial registry config
-        stringio = StringIO()
-        yaml.dump(
+        registryYamlText = parsing.dump(
             {
                 "layout": "ontology_detail",
                 **issueDetails,
                 "products": [{"id": f"{project_id.lower()}.owl"}],
                 "activity_status": "active",
-            },
-            stringio,
+            }
         )
-        registryYamlText = stringio.getvalue()
         registryYamlText = app.config["NEW_PROJECT_REGISTRY_TEMPLATE"].format(
             idspace_lower=project_id.lower(),
             yaml_registry_details=registryYamlText,
@@ -694,7 +1091,7 @@ def edit_new():
             yaml=registryYamlText,
             issueNumber=issueNumber,
             login=g.user.github_login,
-            schema_file=json.dumps(registry_schema),
+            schema_file=json.dumps(snapshot.registry_schema),
         )
     elif editor_type == "purl":
         # Generate some text to populate the editor initially with,
@@ -715,7 +1112,7 @@ def edit_new():
             yaml=purlYamlText,
             addIssueLink=addIssueLink,
             login=g.user.github_login,
-            schema_file=json.dumps(purl_schema),
+            schema_file=json.dumps(snapshot.purl_schema),
         )
     else:
         return Response("Malformed POST request, unknown editor type", status=400)
@@ -729,21 +1126,8 @@ def prepare_new():
     process. This endpoint generates a form to request information about the new project from the
     user. Once the form is submitted a request is sent to begin editing the new config.
     """
-
-    issues = {}
-    issue_list = github_call(
-        "GET",
-        f'repos/{app.config["GITHUB_ORG"]}/{editor_types["registry"]["repo"]}/issues',
-        params={"state": "open", "labels": "new ontology"},
-    )
-    for issue in issue_list:
-        number = issue["number"]
-        title = issue["title"]
-        logger.debug(f"Got issue: {number}, {title}")
-        issues[number] = title
-
     return render_template(
-        "prepare_new_config.jinja2", login=g.user.github_login, issueList=issues
+        "prepare_new_config.jinja2", login=g.user.github_login, issueList=new_ontology_issues()
     )
 
 
@@ -753,7 +1137,11 @@ def prepare_foundry():
     """
     Handles a request to create a new OBO Foundry ontology registration.
     """
-    github_user = github_call("GET", "/user")
+    # The user's profile is retrieved when they log in, and is only missing if their identity has
+    # since been reloaded from the database:
+    github_user = g.user.profile
+    if github_user is None:
+        github_user = g.user.profile = github_call("GET", "/user")
 
     github_name = github_user["name"]
     github_email = github_user["email"] if "email" in github_user else None
@@ -885,9 +1273,7 @@ def new_foundry():
     issueDict["data_source"] = dataSource
     issueDict["remarks"] = remarks
 
-    stringio = StringIO()
-    yaml.dump(issueDict, stringio)
-    issueBody = stringio.getvalue()
+    issueBody = parsing.dump(issueDict)
     issueTitle = f"New Ontology Request: {ontologyTitle}"
 
     url = app.config["REGISTRY_REQUEST"]
@@ -986,7 +1372,8 @@ def edit_config(editor_type, filename):
     if not config_file:
         raise Exception(f"Could not get the contents of: {filename}")
 
-    schema_file = purl_schema if editor_type == "purl" else registry_schema
+    snapshot = metadata.snapshot
+    schema_file = snapshot.purl_schema if editor_type == "purl" else snapshot.registry_schema
 
     decodedBytes = base64.b64decode(config_file["content"])
     decodedStr = str(decodedBytes, "utf-8")
@@ -996,6 +1383,7 @@ def edit_config(editor_type, filename):
         editor_type=editor_type,
         yaml=decodedStr,
         filename=config_file["name"],
+        base_sha=config_file["sha"],
         login=g.user.github_login,
         schema_file=json.dumps(schema_file),
     )
@@ -1009,240 +1397,203 @@ def validate():
     HTTP status of 200. Otherwise if there is either a YAML parsing error or a violation of the
     constraints specified in the JSON schema, then a 400 is returned along with a JSON object
     indicating a summary of the error, the line number of the error (if available), and the detailed
-    output of the error.
-    """
-
-    def find_schema_error_line(keys, yaml_source):
-        logger.debug(f"Trying to determine line number for path {keys}")
-        line_number = -1
-        if err.validator == "additionalProperties":
-            logger.debug("Got additional properties error")
-            m = err.message
-            key = m[
-                m.index("'") + 1 : m.rindex("'")
-            ]  # get the added key name; this is hacky
-            keys.append(key)
-        if len(keys) > 0:
-            subset = yaml_source
-            while len(keys) > 1:
-                subset = subset[
-                    keys.pop(0)
-                ]  # follow the path, stopping with one key left
-            if keys[0] in subset.lc.data:
-                pos = subset.lc.data[keys[0]]  # get ruamel.yaml's line-column information
-                line_number = pos[0] + 1
-                logger.debug(f"at line {pos[0] + 1}, column {pos[1] + 1}")
-        return line_number
+    output of the error. Violations of REGISTRY constraints at the 'warning' or 'info' level are
+    returned in the same way, but with a status of 200.
 
+    If the optional all_errors parameter is 'true', every problem found in the code is reported,
+    in a JSON array of such objects, rather than only the most relevant one.
+    """
     if request.form.get("code") is None:
         return Response("Malformed POST request", status=400)
 
+    code = request.form["code"]
+    editor_type = request.form.get("editor_type")
+    all_errors = request.form.get("all_errors") == "true"
+    if editor_type not in editor_types:
+        return Response(f"Unknown editor type: {editor_type}", status=400)
+
+    snapshot = metadata.snapshot
+    schema_name = f"{editor_type}_schema"
+    key = (
+        editor_type,
+        snapshot.versions[schema_name],
+        all_errors,
+        hashlib.sha256(code.encode("utf-8")).hexdigest(),
+    )
+    results = validation_cache.get(key)
+    if results is None:
+        try:
+            results = validation.check_config(
+                editor_type,
+                code,
+                validators.get(editor_type, getattr(snapshot, schema_name)),
+                all_errors,
+            )
+        except validation.MalformedConfig as err:
+            return Response(format(err), status=400)
+        validation_cache.set(key, results)
+
+    logger.debug(f"Got schema validation results: {results}")
+    status = 400 if any(r["result_type"] == "error" for r in results) else 200
+    if all_errors:
+        return jsonify(results), status
+    if not results:
+        return Response(status=200)
+    return jsonify(validation.most_severe(results)), status
+
+
+def get_master_head(repo, access_token=None):
+    """
+    Get the sha of the commit at the HEAD of the master branch in the given github repository,
+    along with the sha of that commit's tree.
+    """
+    # The new commit must be based on the actual HEAD, so this cannot be answered from the cache:
+    response = github_call(
+        "GET", f"repos/{repo}/commits/master", access_token=access_token, urgent=True
+    )
+    if not response or "sha" not in response:
+        raise Exception(f"Unable to get SHA for HEAD of master in {repo}")
+    return response["sha"], response["commit"]["tree"]["sha"]
+
+
+def branch_exists(repo, branch, access_token=None):
+    """
+    Check whether the given branch exists in the given github repository.
+    """
     try:
-        code = request.form["code"]
-        editor_type = request.form["editor_type"]
-        if editor_type == "purl":
-            s = purl_schema
-            yaml_source = yaml.load(code)
-            jsonschema.validate(yaml_source, purl_schema)
-        elif editor_type == "registry":
-            results = {}
-            split_pattern = "---"
-            code_sections = re.split(split_pattern, code)
-            if len(code_sections) < 2:
-                logger.debug(f"Not enough sub-sections in registry config code {code}")
-                return Response(
-                    f"Not enough sub-sections in registry config "
-                    f"file code: {len(code_sections)}",
-                    status=400,
-                )
-            yaml_code = code_sections[1]
-            yaml_source = yaml.load(yaml_code)
-            s = registry_schema
-            try:
-                jsonschema.validate(yaml_source, s)
-            except jsonschema.exceptions.ValidationError as err:
-                logger.debug(
-                    f"JSON validation error in {list(err.absolute_schema_path)} "
-                    f":: {list(err.relative_schema_path)} "
-                )
-                title = list(err.absolute_schema_path)[0]  # first entry
-                if title == "required":
-                    field_names = re.findall(r"\'(.*?)\'", err.message)  # Get which field
-                    if len(field_names) > 0:
-                        title = field_names[0]
-                if title == "properties":
-                    title = list(err.absolute_schema_path)[
-                        1
-                    ]  # Which property? Second entry
-                logger.debug(f"Got error title {title}")
-                # What is the level of this error?
-                if "level" in err.schema:
-                    result_type = err.schema["level"]
-                    logger.debug(f"Got error level: {result_type}")
-                else:
-                    logger.debug(f"No error level found in {err.schema}")
-                    result_type = "warning"
-
-                if "is_obsolete" in yaml_source and yaml_source["is_obsolete"]:
-                    logger.debug(
-                        "Demoting schema error level for obsolete registry entry"
-                    )
-                    if result_type == "error":
-                        result_type = "warning"
-                    elif result_type == "warning":
-                        result_type = "info"
-
-                if result_type not in results:
-                    results[result_type] = {}
-
-                logger.debug(err.message)
-                line_number = find_schema_error_line(list(err.absolute_path), yaml_source)
-
-                if result_type == "error":
-                    status = 400
-                else:
-                    status = 200
-                error_summary = err.message
-                if err.absolute_schema_path:
-                    err_descr = err.schema.get("description")
-                    if err_descr:
-                        error_summary = f"{err.message} ({err_descr})"
-                response = (
-                    jsonify(
-                        {
-                            "result_type": result_type,
-                            "summary": format(error_summary),
-                            "line_number": line_number,
-                            "details": format(err),
-                        }
-                    ),
-                    status,
-                )
-                results[result_type][title] = response
-            logger.debug(f"Got schema validation results: {results}")
-            for result_type in ["error", "warning", "info"]:
-                if (
-                    result_type in results
-                    and results[result_type] is not None
-                    and len(results[result_type].values()) > 0
-                ):
-                    return next(iter(results[result_type].values()))
-        else:
-            return Response(f"Unknown editor type: {editor_type}", status=400)
-
-    except (DuplicateKeyError, YAMLError, TypeError) as err:
-        line_number = -1
-        if hasattr(err, "problem_mark"):
-            mark = err.problem_mark
-            logger.debug(f"Error has position: ({mark.line+1}:{mark.column+1})")
-            line_number = mark.line + 1
-        else:
-            logger.debug(f"Error {err} has no associated line number information.")
-        return (
-            jsonify(
-                {
-                    "result_type": "error",
-                    "summary": "YAML parsing error",
-                    "line_number": line_number,
-                    "details": format(err),
-                }
-            ),
-            400,
-        )
-    except jsonschema.exceptions.ValidationError as err:
-        result_type = "error"
-        logger.debug(err.message)
-        line_number = find_schema_error_line(list(err.absolute_path), yaml_source)
-        status = 400
-        error_summary = err.message
-        if err.absolute_schema_path:
-            err_descr = err.schema.get("description")
-            if err_descr:
-                error_summary = f"{err.message} ({err_descr})"
-        return (
-            jsonify(
-                {
-                    "result_type": result_type,
-                    "summary": format(error_summary),
-                    "line_number": line_number,
-                    "details": format(err),
-                }
-            ),
-            status,
+        github_call(
+            "GET", f"repos/{repo}/git/ref/heads/{branch}", access_token=access_token, urgent=True
         )
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return False
+        raise
+    return True
+
 
-    return Response(status=200)
+def git_blob_sha(contents):
+    """
+    Compute the sha that git gives to a blob with the given contents (a string), which identifies
+    the version of a file without needing to compare its contents.
+    """
+    data = contents.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
 
 
-def get_file_sha(repo, rep_dir, filename):
+def get_blob_shas(repo, commit_sha, directory, access_token=None):
     """
-    Get the sha of the given filename from the given github repository
+    Get the shas of the blobs in the given directory of the given commit in the given github
+    repository, as a dictionary from path to sha. Only the listing of the directory's tree is
+    retrieved, not the contents of any of its files.
     """
-    response = github_call("GET", f"repos/{repo}/contents/{rep_dir}/{filename}")
-    if not response or "sha" not in response:
-        raise Exception(
-            f"Unable to get the current SHA value for {filename} in {repo}/{rep_dir}"
+    try:
+        tree = github_call(
+            "GET",
+            f"repos/{repo}/git/trees/{commit_sha}:{directory}",
+            access_token=access_token,
+            urgent=True,
         )
-    return response["sha"]
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return {}
+        raise
+    return {
+        posixpath.join(directory, entry["path"]): entry["sha"]
+        for entry in tree.get("tree", [])
+        if entry.get("type") == "blob"
+    }
 
 
-def get_master_sha(repo):
+def branch_name(filenames):
     """
-    Get the sha for the HEAD of the master branch in the given github repository
+    Generate the name of a new branch for changes to the given filenames.
     """
-    response = github_call("GET", f"repos/{repo}/git/ref/heads/master")
-    if not response or "object" not in response or "sha" not in response["object"]:
-        raise Exception(f"Unable to get SHA for HEAD of master in {repo}")
-    return response["object"]["sha"]
+    label = filenames[0].replace(app.config["YAML_EXT"], "").upper()
+    if len(filenames) > 1:
+        label += f"_AND_{len(filenames) - 1}_MORE"
+    return f"{g.user.github_login}_{label}_{datetime.utcnow().strftime('%Y-%m-%d_%H%M%S')}"
 
 
-def create_branch(repo, filename, master_sha):
+def commit_to_new_branch(repo, branch, files, commit_msg, access_token=None, base_shas=None):
     """
-    Create a new branch, from master (identified by its sha), based on the given filename
-    in the given repository.
+    Create a new branch in the given repository containing a single commit, on top of the HEAD of
+    master, which sets the contents of each of the files in the given dictionary (from path within
+    the repository to contents) and has the given commit message. The commit is built using the Git
+    Data API: a tree is created from master's tree and the new file contents (GitHub creates the
+    blobs for them), then a commit of that tree, and finally the branch, which is never left
+    pointing at anything other than the finished commit.
+
+    Since a tree silently replaces any existing file, the optional base_shas dictionary gives, for
+    some of the paths, the sha of the blob that the new contents are based on, or None for a file
+    that is being added. Nothing is committed unless master still has those blobs at those paths,
+    which is checked using a single listing of each directory containing them.
     """
-    # Generate the branch name:
-    branch = (
-        f"{g.user.github_login}_{filename.replace(app.config['YAML_EXT'], '').upper()}"
-        f"_{datetime.utcnow().strftime('%Y-%m-%d_%H%M%S')}"
+    master_sha, tree_sha = get_master_head(repo, access_token)
+
+    base_shas = base_shas or {}
+    master_blob_shas = {}
+    for directory in sorted({posixpath.dirname(path) for path in base_shas}):
+        master_blob_shas.update(get_blob_shas(repo, master_sha, directory, access_token))
+    for path, base_sha in base_shas.items():
+        if master_blob_shas.get(path) != base_sha:
+            if base_sha is None:
+                raise Exception(f"{path} already exists in master of {repo}")
+            raise Exception(f"{path} has been changed in master of {repo} since it was loaded")
+
+    tree = github_call(
+        "POST",
+        f"repos/{repo}/git/trees",
+        params={
+            "base_tree": tree_sha,
+            "tree": [
+                {"path": path, "mode": "100644", "type": "blob", "content": content}
+                for path, content in files.items()
+            ],
+        },
+        access_token=access_token,
     )
+    if not tree or "sha" not in tree:
+        raise Exception(f"Unable to create a tree for {', '.join(files)} in {repo}")
+    if tree["sha"] == tree_sha:
+        raise Exception(f"The submitted contents of {', '.join(files)} are identical to master")
+
+    commit = github_call(
+        "POST",
+        f"repos/{repo}/git/commits",
+        params={"message": commit_msg, "tree": tree["sha"], "parents": [master_sha]},
+        access_token=access_token,
+    )
+    if not commit or "sha" not in commit:
+        raise Exception(f"Unable to commit {', '.join(files)} in {repo}")
 
     response = github_call(
         "POST",
         f"repos/{repo}/git/refs",
-        params={"ref": f"refs/heads/{branch}", "sha": master_sha},
+        params={"ref": f"refs/heads/{branch}", "sha": commit["sha"]},
+        access_token=access_token,
     )
     if not response:
         raise Exception(f"Unable to create new branch {branch} in {repo}")
-
-    return branch
+    return commit["sha"]
 
 
-def commit_to_branch(repo, branch, code, rep_dir, filename, commit_msg, file_sha=None):
+def find_pr(repo, branch, access_token=None):
     """
-    Commit the given code to the given branch in the given repo, using the given commit message.
-    If the optional file_sha parameter is specified (because this commit is for an existing file)
-    then include it in the request to github.
+    Find the pull request for the given branch in the given github repository, returning the info
+    on it returned by github, or None if there is none.
     """
-    data = {
-        "message": commit_msg,
-        "content": base64.b64encode(code.encode("utf-8")).decode(),
-        "branch": branch,
-    }
-
-    if file_sha:
-        data["sha"] = file_sha
-
-    response = github_call(
-        "PUT", f"repos/{repo}/contents/{rep_dir}/{filename}", params=data
+    owner = repo.split("/")[0]
+    pulls = github_call(
+        "GET",
+        f"repos/{repo}/pulls",
+        params={"head": f"{owner}:{branch}", "state": "all"},
+        access_token=access_token,
+        urgent=True,
     )
-    if not response:
-        raise Exception(
-            f"Unable to commit addition of {filename} to branch {branch} in {repo}"
-        )
+    return pulls[0] if pulls else None
 
 
-def create_pr(repo, branch, commit_msg, draft, long_msg=""):
+def create_pr(repo, branch, commit_msg, draft, long_msg="", access_token=None):
     """
     Create a pull request for the given branch in the given repository in github
     """
@@ -1250,13 +1601,187 @@ def create_pr(repo, branch, commit_msg, draft, long_msg=""):
     if draft == "true":
         data["draft"] = True
     logger.debug(f"PR data={data}")
-    response = github_call("POST", f"repos/{repo}/pulls", params=data)
+    response = github_call("POST", f"repos/{repo}/pulls", params=data, access_token=access_token)
     if not response:
         raise Exception(f"Unable to create PR for branch {branch} in {repo}")
 
     return response
 
 
+# The threads that carry out submission jobs:
+submission_executor = ThreadPoolExecutor(
+    app.config["SUBMISSION_WORKERS"], thread_name_prefix="submission"
+)
+# The ids of the jobs that are queued for, or being carried out by, this instance's workers:
+queued_jobs = set()
+queued_jobs_lock = threading.Lock()
+
+
+def update_job(job, status, result=None):
+    """
+    Move the given job to the given stage, recording the given result, if any.
+    """
+    job.status = status
+    job.updated_at = datetime.utcnow()
+    if result is not None:
+        job.result = json.dumps(result)
+    db_session.commit()
+
+
+def run_job(job_id):
+    """
+    Carry out the submission job with the given id, in a submission worker thread.
+
+    A job that has been started, but has made no progress for JOB_LEASE seconds, is assumed to have
+    been interrupted (e.g. by a restart of the server carrying it out) and is resumed from where
+    it stopped. Since the branch is only created once its commit is finished, a job that was
+    interrupted while committing has committed its changes if and only if its branch exists, and a
+    job that was interrupted while creating its PR may already have created it.
+    """
+    job = None
+    try:
+        job = Job.query.get(job_id)
+        if job is None or job.status in Job.finished:
+            return
+        stage = job.status
+        lease_start = datetime.utcnow() - timedelta(seconds=app.config["JOB_LEASE"])
+        if stage != "queued" and job.updated_at > lease_start:
+            logger.info(f"Job {job_id} is being carried out by another worker")
+            return
+        user = User.query.get(job.user_id)
+        if user is None or not user.github_access_token:
+            raise Exception("The user who submitted this job is no longer logged in")
+        payload = json.loads(job.payload)
+
+        # Claim the job. If another worker has claimed it since it was loaded, this raises a
+        # StaleDataError:
+        update_job(job, "committing" if stage == "queued" else stage)
+
+        if stage in ["queued", "committing"]:
+            if stage == "committing" and branch_exists(
+                payload["repo"], payload["branch"], user.github_access_token
+            ):
+                logger.info(f"Branch {payload['branch']} was already committed; creating its PR")
+            else:
+                commit_to_new_branch(
+                    payload["repo"],
+                    payload["branch"],
+                    payload["files"],
+                    payload["commit_msg"],
+                    user.github_access_token,
+                    payload.get("base_shas"),
+                )
+                logger.info(f"Committed {', '.join(payload['files'])} to {payload['branch']}")
+            update_job(job, "creating_pr")
+
+        pr_info = None
+        if stage == "creating_pr":
+            pr_info = find_pr(payload["repo"], payload["branch"], user.github_access_token)
+        if pr_info is None:
+            pr_info = create_pr(
+                payload["repo"],
+                payload["branch"],
+                payload["commit_msg"],
+                payload["draft"],
+                payload["long_msg"],
+                user.github_access_token,
+            )
+        update_job(job, "done", {"pr_info": pr_info})
+        logger.info(f"Created a PR for branch {payload['branch']} in {payload['repo']}")
+    except StaleDataError:
+        db_session.rollback()
+        logger.warning(f"Job {job_id} is being processed by another worker")
+    except Exception as e:
+        db_session.rollback()
+        logger.error(f"Job {job_id} failed: {e}")
+        if job is not None:
+            update_job(job, "failed", {"error": format(e)})
+    finally:
+        db_session.remove()
+        with queued_jobs_lock:
+            queued_jobs.discard(job_id)
+
+
+def queue_job(job_id):
+    """
+    Queue the job with the given id for the submission workers, unless it is already queued.
+    Returns True if it was queued.
+    """
+    with queued_jobs_lock:
+        if job_id in queued_jobs:
+            return False
+        queued_jobs.add(job_id)
+    submission_executor.submit(run_job, job_id)
+    return True
+
+
+def enqueue_submission(repo, branch, files, commit_msg, draft, long_msg, base_shas=None):
+    """
+    Record a job to commit the given files (a dictionary from path to contents) to a new branch in
+    the given repo and to create a PR for it, on behalf of the current user, and queue it for the
+    submission workers. The optional base_shas are checked before committing, as described in
+    commit_to_new_branch(). Returns the job.
+    """
+    job = Job(
+        g.user.id,
+        {
+            "repo": repo,
+            "branch": branch,
+            "files": files,
+            "commit_msg": commit_msg,
+            "draft": draft,
+            "long_msg": long_msg or "",
+            "base_shas": base_shas or {},
+        },
+    )
+    db_session.add(job)
+    db_session.commit()
+    queue_job(job.id)
+    logger.info(f"Queued job {job.id} to submit {', '.join(files)} to a new branch in {repo}")
+    return job
+
+
+def resume_jobs():
+    """
+    Queue every unfinished submission job that has made no progress for JOB_LEASE seconds, e.g.
+    because the server that was carrying it out was restarted. Jobs that are still being carried
+    out, by this or any other instance of the editor, are left alone.
+    """
+    lease_start = datetime.utcnow() - timedelta(seconds=app.config["JOB_LEASE"])
+    abandoned = [
+        job.id
+        for job in Job.query.filter(Job.status.notin_(Job.finished), Job.updated_at < lease_start)
+    ]
+    db_session.remove()
+    resumed = sum(queue_job(job_id) for job_id in abandoned)
+    if resumed:
+        logger.info(f"Resumed {resumed} interrupted submission jobs")
+
+
+def run_job_recovery():
+    """
+    Resume interrupted submission jobs every JOB_LEASE / 2 seconds, in a background thread.
+    """
+    while True:
+        try:
+            resume_jobs()
+        except Exception as e:
+            logger.error(f"Could not resume interrupted submission jobs: {e}")
+        time.sleep(max(app.config["JOB_LEASE"] / 2, 1))
+
+
+@app.route("/jobs/<job_id>")
+@verify_logged_in
+def job_status(job_id):
+    """
+    Route for polling the status of a submission job belonging to the current user.
+    """
+    job = Job.query.get(job_id)
+    if job is None or job.user_id != g.user.id:
+        return Response(f"Unknown job: {job_id}", status=404)
+    return jsonify(job.describe())
+
+
 @app.route("/add_config", methods=["POST"])
 @verify_logged_in
 def add_config():
@@ -1272,29 +1797,17 @@ def add_config():
     if any([item is None for item in [filename, commit_msg, code, editor_type]]):
         return Response("Malformed POST request", status=400)
 
+    # A new config must not replace an existing one, which is checked, against the master commit
+    # that the new one is added to, when the job is carried out:
     repo = f'{app.config["GITHUB_ORG"]}/{editor_types[editor_type]["repo"]}'
+    path = f'{editor_types[editor_type]["dir"]}/{filename}'
+    job = enqueue_submission(
+        repo, branch_name([filename]), {path: code}, commit_msg, draft, long_msg, {path: None}
+    )
 
-    try:
-        master_sha = get_master_sha(repo)
-        new_branch = create_branch(repo, filename, master_sha)
-        logger.info(f"Created a new branch: {new_branch} in {repo}")
-        commit_to_branch(
-            repo,
-            new_branch,
-            code,
-            editor_types[editor_type]["dir"],
-            filename,
-            commit_msg,
-        )
-        logger.info(f"Committed addition of {filename} to branch {new_branch} in {repo}")
-        pr_info = create_pr(repo, new_branch, commit_msg, draft, long_msg)
-        logger.info(f"Created a PR for branch {new_branch} in {repo}")
-    except Exception as e:
-        return Response(format(e), status=400)
-
-    # We return github's response to the caller, which contains info on the PR (among other things,
-    # a URL to use to access it):
-    return jsonify({"pr_info": pr_info})
+    # The PR is submitted in the background. We return a description of the job to the caller,
+    # which can poll /jobs/<job_id> for its progress and (among other things) the URL of the PR:
+    return jsonify(job.describe()), 202
 
 
 @app.route("/update_config", methods=["POST"])
@@ -1302,6 +1815,7 @@ def add_config():
 def update_config():
     """
     Route for initiating a pull request to update a PURL config file in the github repository.
+    The sha of the blob that was loaded into the editor is given as base_sha.
     """
     filename = request.form.get("filename")
     code = request.form.get("code")
@@ -1309,56 +1823,178 @@ def update_config():
     draft = request.form.get("draft")
     editor_type = request.form.get("editor_type")
     long_msg = request.form.get("long_msg")
+    base_sha = request.form.get("base_sha")
 
     if any([item is None for item in [filename, commit_msg, code, editor_type]]):
         return Response("Malformed POST request", status=400)
 
-    # Get the contents of the current version of the file:
-    curr_contents = github_call(
-        "GET",
-        f'repos/{app.config["GITHUB_ORG"]}/{editor_types[editor_type]["repo"]}/'
-        f'contents/{editor_types[editor_type]["dir"]}/{filename}',
-    )
-    if not curr_contents:
-        raise Exception(f"Could not get the contents of: {filename}")
-
-    decodedBytes = base64.b64decode(curr_contents["content"])
-    decodedStr = str(decodedBytes, "utf-8")
-
-    # Verify that the contents to be committed differ from the current contents, return a 422
-    # if they are the same:
-    if decodedStr == code:
+    repo = f'{app.config["GITHUB_ORG"]}/{editor_types[editor_type]["repo"]}'
+    path = f'{editor_types[editor_type]["dir"]}/{filename}'
+    if not base_sha:
+        # The editor was loaded before base_sha was sent, so get the sha of the current version:
+        curr_contents = github_call("GET", f"repos/{repo}/contents/{path}")
+        if not curr_contents:
+            raise Exception(f"Could not get the contents of: {filename}")
+        base_sha = curr_contents["sha"]
+
+    # Verify that the contents to be committed differ from the version they are based on, return a
+    # 422 if they are the same:
+    if git_blob_sha(code) == base_sha:
         return Response(
             "Update request refused: The submitted configuration is identical to the "
             "currently saved version.",
             status=422,
         )
 
-    repo = f'{app.config["GITHUB_ORG"]}/{editor_types[editor_type]["repo"]}'
+    # The update is refused if master has a different version by the time it is committed:
+    job = enqueue_submission(
+        repo,
+        branch_name([filename]),
+        {path: code},
+        commit_msg,
+        draft,
+        long_msg,
+        {path: base_sha},
+    )
 
-    try:
-        file_sha = get_file_sha(repo, editor_types[editor_type]["dir"], filename)
-        master_sha = get_master_sha(repo)
-        new_branch = create_branch(repo, filename, master_sha)
-        logger.info(f"Created a new branch: {new_branch} in {repo}")
-        commit_to_branch(
+    # The PR is submitted in the background. We return a description of the job to the caller,
+    # which can poll /jobs/<job_id> for its progress and (among other things) the URL of the PR:
+    return jsonify(job.describe()), 202
+
+
+@app.route("/submit_batch", methods=["POST"])
+@verify_logged_in
+def submit_batch():
+    """
+    Route for initiating pull requests for a batch of edits to config files, which may be in
+    different repositories (e.g. both the PURL and the REGISTRY configuration of a new ontology).
+    The body of the request is a JSON object of the form:
+
+    {"commit_msg": "...", "long_msg": "...", "draft": false,
+     "edits": [{"editor_type": "purl", "filename": "xyz.yml", "code": "...",
+                "base_sha": "..."}, ...]}
+
+    The base_sha of an edit to an existing file is the sha of the blob that the edit is based on;
+    an edit without one adds a new file. The edits are grouped by repository, and a submission job
+    is queued for each one, which creates a single branch, containing a single commit of all of the
+    edits to that repository, along with a pull request for it. Like any other submission, a job
+    fails if any file that it adds already exists, or any file that it edits has changed since the
+    version that the edit is based on. The response lists, for each repository, the files that are
+    to be committed to it and the job that does so, which can be polled at /jobs/<job_id>.
+    """
+    batch = request.get_json(silent=True)
+    if (
+        not isinstance(batch, dict)
+        or not batch.get("commit_msg")
+        or not isinstance(batch.get("edits"), list)
+        or not batch["edits"]
+    ):
+        return Response("Malformed POST request", status=400)
+
+    # Group the edits by repository, as dictionaries from path within the repository to code and
+    # to the sha of the blob that the code is based on (None for a new file):
+    grouped = {}
+    for edit in batch["edits"]:
+        if (
+            not isinstance(edit, dict)
+            or edit.get("editor_type") not in editor_types
+            or not isinstance(edit.get("code"), str)
+            or not edit.get("filename")
+            or posixpath.basename(edit["filename"]) != edit["filename"]
+            or not isinstance(edit.get("base_sha") or "", str)
+        ):
+            return Response(f"Malformed edit in POST request: {edit}", status=400)
+        editor_type = editor_types[edit["editor_type"]]
+        repo = f'{app.config["GITHUB_ORG"]}/{editor_type["repo"]}'
+        path = f'{editor_type["dir"]}/{edit["filename"]}'
+        files, base_shas = grouped.setdefault(repo, ({}, {}))
+        if path in files:
+            return Response(f"{edit['filename']} is edited more than once", status=400)
+        base_sha = edit.get("base_sha") or None
+        if base_sha is not None and git_blob_sha(edit["code"]) == base_sha:
+            return Response(
+                f"Batch refused: The submitted configuration for {edit['filename']} is identical "
+                "to the version it is based on.",
+                status=422,
+            )
+        files[path] = edit["code"]
+        base_shas[path] = base_sha
+
+    # The PRs are submitted in the background by the submission workers:
+    draft = "true" if batch.get("draft") else "false"
+    results = []
+    for repo, (files, base_shas) in grouped.items():
+        job = enqueue_submission(
             repo,
-            new_branch,
-            code,
-            editor_types[editor_type]["dir"],
-            filename,
-            commit_msg,
-            file_sha,
+            branch_name([posixpath.basename(path) for path in files]),
+            files,
+            batch["commit_msg"],
+            draft,
+            batch.get("long_msg") or "",
+            base_shas,
         )
-        logger.info(f"Committed update of {filename} to branch {new_branch} in {repo}")
-        pr_info = create_pr(repo, new_branch, commit_msg, draft, long_msg)
-        logger.info(f"Created a PR for branch {new_branch} in {repo}")
-    except Exception as e:
-        return Response(format(e), status=400)
+        results.append({"repo": repo, "files": list(files), **job.describe()})
+    return jsonify({"jobs": results}), 202
+
+
+## Metrics
+
+
+def cache_metrics():
+    """
+    Report the statistics of the application's caches, and of the other components that keep
+    count of what they do, for the /metrics endpoint.
+    """
+    index_stats = index_cache.stats()
+    return (
+        metrics.cache_samples("github", github_cache.stats())
+        + metrics.cache_samples("validation", validation_cache.stats())
+        + metrics.cache_samples("identity", identity_cache.stats())
+        + metrics.cache_samples("index", index_stats, hit_keys=["fresh_hits", "stale_hits"])
+        + [
+            (
+                "editor_index_refresh_errors_total",
+                "counter",
+                "The number of failed background refreshes of the index page's listing.",
+                {},
+                index_stats["refresh_errors"],
+            ),
+            (
+                "editor_schema_compilations_total",
+                "counter",
+                "The number of times that a validator was built for a JSON schema.",
+                {},
+                validators.compilations,
+            ),
+            (
+                "editor_github_rate_limit_deferrals_total",
+                "counter",
+                "The number of GitHub calls answered from the cache because of a low budget.",
+                {},
+                github_governor.deferrals,
+            ),
+        ]
+    )
+
+
+metrics.registry.register_collector(cache_metrics)
+
+
+@app.route("/metrics")
+def metrics_page():
+    """
+    Returns the application's metrics in Prometheus' text exposition format, to clients that give
+    the METRICS_TOKEN as a bearer token.
+    """
+    token = app.config["METRICS_TOKEN"]
+    if not token:
+        return Response("Metrics are not enabled", status=404)
+
+    given = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(given.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+        return Response("Unauthorized", status=401, headers={"WWW-Authenticate": "Bearer"})
 
-    # We return github's response to the caller, which contains info on the PR (among other things,
-    # a URL to use to access it):
-    return jsonify({"pr_info": pr_info})
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
 
 
 def init_db():
@@ -1366,10 +2002,128 @@ def init_db():
     Initialise the users database
     """
     Base.metadata.create_all(bind=engine)
+    migrate_db()
+
+
+def migrate_db():
+    """
+    Bring a users database created by an earlier version of the editor up to date. These recorded
+    every login separately, so each person's records are merged into their most recent one before
+    github_id is indexed uniquely. SQLite reuses the ids of deleted rows unless a table is declared
+    with AUTOINCREMENT, so a users table declared without it is rebuilt with it, and with a sequence
+    that starts after every id that is still referred to by a submission job.
+    """
+    columns = [column["name"] for column in inspect(engine).get_columns("users")]
+    with engine.begin() as connection:
+        if "last_login" not in columns:
+            column_type = User.__table__.c.last_login.type.compile(engine.dialect)
+            connection.execute(text(f"ALTER TABLE users ADD COLUMN last_login {column_type}"))
+            # Count existing users as having just logged in, so that they are kept for as long as
+            # new ones:
+            connection.execute(update(User).values(last_login=datetime.utcnow()))
+
+        duplicates = connection.execute(
+            select(User.github_id, func.max(User.id))
+            .where(User.github_id.isnot(None))
+            .group_by(User.github_id)
+            .having(func.count() > 1)
+        ).all()
+        for github_id, latest in duplicates:
+            older = select(User.id).where(User.github_id == github_id, User.id != latest)
+            connection.execute(update(Job).where(Job.user_id.in_(older)).values(user_id=latest))
+            connection.execute(delete(User).where(User.github_id == github_id, User.id != latest))
+        if duplicates:
+            logger.info(f"Merged the duplicate records of {len(duplicates)} users")
+
+        if engine.dialect.name == "sqlite":
+            definition = connection.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'users'")
+            ).scalar()
+            if "AUTOINCREMENT" not in definition.upper():
+                rebuild_users_table(connection)
+
+    for index in User.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def rebuild_users_table(connection):
+    """
+    Replace the SQLite users table with one created from the current definition of User, copying
+    every record to it, and start its id sequence after the largest id of any user, past or
+    present, that is referred to in the users or jobs tables.
+    """
+    for index in User.__table__.indexes:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    connection.execute(text("ALTER TABLE users RENAME TO users_old"))
+    User.__table__.create(bind=connection)
+    columns = ", ".join(column.name for column in User.__table__.columns)
+    connection.execute(text(f"INSERT INTO users ({columns}) SELECT {columns} FROM users_old"))
+    connection.execute(text("DROP TABLE users_old"))
+
+    last_id = max(
+        connection.execute(select(func.max(User.id))).scalar() or 0,
+        connection.execute(select(func.max(Job.user_id))).scalar() or 0,
+    )
+    connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'users'"))
+    connection.execute(
+        text("INSERT INTO sqlite_sequence (name, seq) VALUES ('users', :seq)"), {"seq": last_id}
+    )
+    logger.info(f"Rebuilt the users table so that user ids after {last_id} are never reused")
+
+
+def compact_db():
+    """
+    Delete the records of users who have not logged in for USER_RETENTION_DAYS (unless they have
+    unfinished submission jobs), and of submission jobs that finished more than JOB_RETENTION_DAYS
+    ago or whose users have been deleted, so that the database does not grow without bound.
+    """
+    now = datetime.utcnow()
+    stale_users = User.last_login < now - timedelta(days=app.config["USER_RETENTION_DAYS"])
+    stale_users &= User.id.notin_(
+        select(Job.user_id).where(Job.status.notin_(Job.finished), Job.user_id.isnot(None))
+    )
+    try:
+        user_ids = db_session.scalars(select(User.id).where(stale_users)).all()
+        users = db_session.execute(delete(User).where(stale_users)).rowcount
+        jobs = db_session.execute(
+            delete(Job).where(
+                Job.status.in_(Job.finished),
+                Job.updated_at < now - timedelta(days=app.config["JOB_RETENTION_DAYS"]),
+            )
+        ).rowcount
+        jobs += db_session.execute(delete(Job).where(Job.user_id.notin_(select(User.id)))).rowcount
+        db_session.commit()
+    finally:
+        db_session.remove()
+
+    for user_id in user_ids:
+        identity_cache.pop(user_id)
+    if users or jobs:
+        logger.info(f"Deleted the records of {users} users and {jobs} submission jobs")
+        if engine.dialect.name == "sqlite":
+            # Shrink the write-ahead log, which otherwise stays as large as it has ever been:
+            with engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def run_db_compaction():
+    """
+    Compact the database every DB_COMPACTION_INTERVAL seconds, in a background thread.
+    """
+    while True:
+        try:
+            compact_db()
+        except Exception as e:
+            logger.error(f"Could not compact the database: {e}")
+        time.sleep(app.config["DB_COMPACTION_INTERVAL"])
 
 
-# Call the function initialising the users db:
+# Call the function initialising the users db, and start resuming any submissions that were
+# interrupted and compacting the db periodically:
 init_db()
+threading.Thread(target=run_job_recovery, name="job-recovery", daemon=True).start()
+if app.config["DB_COMPACTION_INTERVAL"] > 0:
+    threading.Thread(target=run_db_compaction, name="db-compaction", daemon=True).start()
 
 
 if __name__ == "__main__":
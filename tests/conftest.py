@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The server reads its configuration from the environment when it is imported, so it is configured
+# here, before any test imports it: with a database of its own, with every background thread that
+# would otherwise start disabled, and with GitHub replaced by an address where nothing listens.
+os.environ.update(
+    DATABASE_URI=f"sqlite:///{tempfile.mkdtemp(prefix='metadata-editor-tests-')}/users.db",
+    FLASK_SECRET_KEY="test-secret-key",
+    GITHUB_APP_STATE="test-state",
+    GITHUB_URL="http://127.0.0.1:9",
+    GITHUB_API_URL="http://127.0.0.1:9",
+    GITHUB_MAX_RETRIES="0",
+    GITHUB_WEBHOOK_SECRET="test-webhook-secret",
+    METADATA_REFRESH_INTERVAL="0",
+    DB_COMPACTION_INTERVAL="0",
+)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def server():
+    import server
+
+    return server
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+
+@pytest.fixture
+def db(server):
+    """
+    The server's database session, with the users and jobs tables emptied before each test.
+    """
+    server.db_session.query(server.Job).delete()
+    server.db_session.query(server.User).delete()
+    server.db_session.commit()
+    server.identity_cache.clear()
+    yield server.db_session
+    server.db_session.remove()
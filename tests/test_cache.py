@@ -0,0 +1,113 @@
+import threading
+import time
+
+from cache import LRUCache, StaleWhileRevalidateCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "entries": 2,
+        "max_entries": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_lru_cache_expires_entries_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+    now[0] += 10
+    assert cache.get("a") == 1
+    now[0] += 1
+    assert cache.get("a", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_lru_cache_peek_pop_and_invalidate():
+    cache = LRUCache()
+    for key in ["x1", "x2", "y1"]:
+        cache.set(key, key.upper())
+    assert cache.peek("x1") == "X1"
+    assert cache.stats()["hits"] == 0
+    assert cache.pop("x1") == "X1"
+    assert cache.pop("x1", "missing") == "missing"
+    assert cache.invalidate(lambda key: key.startswith("x")) == 1
+    assert cache.peek("y1") == "Y1"
+    assert len(cache) == 1
+
+
+def test_stale_while_revalidate_serves_fresh_then_stale_values(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = StaleWhileRevalidateCache(ttl=10, max_stale=100)
+    reloaded = threading.Event()
+
+    def reload():
+        reloaded.set()
+        return "new"
+
+    assert cache.get("k", lambda: "old") == "old"
+    assert cache.get("k", reload) == "old"
+    assert not reloaded.is_set()
+
+    # A stale value is still served, while it is reloaded in the background:
+    now[0] += 11
+    assert cache.get("k", reload) == "old"
+    assert reloaded.wait(5)
+    for _ in range(100):
+        if cache.get("k", reload) == "new":
+            break
+        time.sleep(0.01)
+    assert cache.get("k", reload) == "new"
+
+    # A value that is too old to serve is reloaded synchronously:
+    now[0] += 200
+    assert cache.get("k", lambda: "newest") == "newest"
+    assert cache.stats()["misses"] == 2
+
+
+def test_stale_while_revalidate_treats_other_versions_as_stale():
+    cache = StaleWhileRevalidateCache(ttl=10, max_stale=100)
+    assert cache.get("k", lambda: "v1", version=1) == "v1"
+    assert cache.get("k", lambda: "v2", version=1) == "v1"
+    # A value of another version is served, but reloaded in the background:
+    assert cache.get("k", lambda: "v2", version=2) == "v1"
+    for _ in range(100):
+        if cache.entries.peek("k")[1] == 2:
+            break
+        time.sleep(0.01)
+    assert cache.get("k", lambda: "v3", version=2) == "v2"
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_stale_while_revalidate_discards_reloads_started_before_invalidation():
+    cache = StaleWhileRevalidateCache(ttl=0, max_stale=100)
+    cache.get("k", lambda: "old")
+    started, release = threading.Event(), threading.Event()
+
+    def slow_reload():
+        started.set()
+        release.wait(5)
+        return "outdated"
+
+    time.sleep(0.01)
+    cache.get("k", slow_reload)
+    assert started.wait(5)
+    assert cache.invalidate(lambda key: True) == 1
+    release.set()
+    for _ in range(100):
+        if not cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert cache.entries.peek("k") is None
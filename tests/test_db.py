@@ -0,0 +1,149 @@
+import json
+import sqlite3
+
+from datetime import datetime, timedelta
+
+# The schema of the users database as created by earlier versions of the editor, which recorded
+# every login separately:
+OLD_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL, github_access_token VARCHAR(255), github_id INTEGER,
+    github_login VARCHAR(255), PRIMARY KEY (id)
+);
+CREATE TABLE jobs (
+    id VARCHAR(32) NOT NULL, user_id INTEGER, status VARCHAR(16), payload TEXT, result TEXT,
+    created_at DATETIME, updated_at DATETIME, version INTEGER NOT NULL, PRIMARY KEY (id)
+);
+"""
+
+LONG_AGO = datetime.utcnow() - timedelta(days=1000)
+
+
+def add_job(server, user_id, status, updated_at=None):
+    job = server.Job(user_id, {"repo": "OBOFoundry/purl.obolibrary.org", "branch": "b"})
+    job.status = status
+    job.updated_at = updated_at or datetime.utcnow()
+    server.db_session.add(job)
+    server.db_session.commit()
+    return job.id
+
+
+def login(server, login, github_id):
+    return server.save_user(f"token-{login}", {"id": github_id, "login": login})
+
+
+def test_save_user_keeps_one_record_per_person(server, db):
+    first = login(server, "alice", 1)
+    again = server.save_user("new-token", {"id": 1, "login": "alice-renamed"})
+    assert again.id == first.id
+    assert db.query(server.User).count() == 1
+    assert again.github_access_token == "new-token"
+    assert again.github_login == "alice-renamed"
+
+
+def test_compact_db_deletes_stale_users_and_old_jobs(server, db):
+    stale = login(server, "stale", 1)
+    busy = login(server, "busy", 2)
+    active = login(server, "active", 3)
+    for user in [stale, busy]:
+        user.last_login = LONG_AGO
+    db.commit()
+    stale_id, busy_id, active_id = stale.id, busy.id, active.id
+    unfinished = add_job(server, busy_id, "committing", LONG_AGO)
+    add_job(server, active_id, "done", LONG_AGO)
+    recent = add_job(server, active_id, "failed")
+    # A finished job of a deleted user is deleted along with them:
+    add_job(server, stale_id, "done")
+    server.identity_cache.set(stale_id, object())
+
+    server.compact_db()
+
+    assert {user.id for user in server.User.query} == {busy_id, active_id}
+    assert {job.id for job in server.Job.query} == {unfinished, recent}
+    assert server.identity_cache.peek(stale_id) is None
+
+
+def test_deleted_user_ids_are_not_reused(server, db):
+    login(server, "alice", 1)
+    bob = login(server, "bob", 2)
+    bob.last_login = LONG_AGO
+    db.commit()
+    bob_id = bob.id
+    bobs_job = add_job(server, bob_id, "done")
+    server.compact_db()
+
+    carol = login(server, "carol", 3)
+    assert carol.id > bob_id
+    assert server.Job.query.get(bobs_job) is None
+
+
+def test_session_is_bound_to_github_account(server, db, client):
+    alice = login(server, "alice", 1)
+    job_id = add_job(server, alice.id, "done")
+    with client.session_transaction() as session:
+        session["user_id"] = alice.id
+        session["github_id"] = 1
+    assert client.get(f"/jobs/{job_id}").status_code == 200
+
+    # A session created for another GitHub account does not authenticate its user id:
+    with client.session_transaction() as session:
+        session["github_id"] = 2
+    response = client.get(f"/jobs/{job_id}")
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/logged_out")
+    with client.session_transaction() as session:
+        assert "user_id" not in session
+
+
+def test_migrate_db_upgrades_old_database(server, tmpdir, monkeypatch):
+    path = str(tmpdir.join("old.db"))
+    connection = sqlite3.connect(path)
+    connection.executescript(OLD_SCHEMA)
+    connection.executemany(
+        "INSERT INTO users VALUES (?, ?, ?, ?)",
+        [(1, "a", 10, "alice"), (2, "b-old", 20, "bob"), (3, "b-new", 20, "bob")],
+    )
+    connection.executemany(
+        "INSERT INTO jobs VALUES (?, ?, 'done', '{}', '{}', '2026-01-01', '2026-01-01', 1)",
+        [("bobs-job", 2), ("deleted-users-job", 7)],
+    )
+    connection.commit()
+
+    monkeypatch.setattr(server, "engine", server.create_db_engine(f"sqlite:///{path}"))
+    server.Base.metadata.create_all(bind=server.engine)
+    server.migrate_db()
+    # Migrating an up to date database changes nothing:
+    server.migrate_db()
+
+    users = connection.execute("SELECT id, github_id, github_access_token FROM users").fetchall()
+    assert sorted(users) == [(1, 10, "a"), (3, 20, "b-new")]
+    assert connection.execute("SELECT count(*) FROM users WHERE last_login IS NULL").fetchone() == (
+        0,
+    )
+    jobs = dict(connection.execute("SELECT id, user_id FROM jobs").fetchall())
+    assert jobs == {"bobs-job": 3, "deleted-users-job": 7}
+    indexes = {
+        row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    assert {"ix_users_github_id", "ix_users_github_access_token"} <= indexes
+    definition = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'users'"
+    ).fetchone()[0]
+    assert "AUTOINCREMENT" in definition
+
+    # The next user gets an id after every one that a job refers to:
+    connection.execute("INSERT INTO users (github_id) VALUES (30)")
+    assert connection.execute("SELECT id FROM users WHERE github_id = 30").fetchone() == (8,)
+    connection.close()
+    server.engine.dispose()
+
+
+def test_job_describe(server, db):
+    job = server.Job(1, {})
+    job.result = json.dumps({"pr_info": {"number": 5}})
+    assert job.describe() == {
+        "job_id": job.id,
+        "status": "queued",
+        "description": "Waiting to be submitted",
+        "pr_info": {"number": 5},
+    }
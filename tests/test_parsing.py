@@ -0,0 +1,75 @@
+import threading
+
+import parsing
+
+
+def test_position_index_of_nested_mappings_and_sequences():
+    document, positions = parsing.load_with_positions(
+        "idspace: XYZ\n"
+        "products:\n"
+        "  - xyz.owl: http://example.org/xyz.owl\n"
+        "  - xyz.obo: http://example.org/xyz.obo\n"
+        "    title: XYZ in OBO format\n"
+        "entries:\n"
+        "- exact: /about\n"
+        "  replacement: http://example.org/about\n"
+    )
+    assert document["products"][1]["title"] == "XYZ in OBO format"
+    assert positions == {
+        ("idspace",): (0, 0),
+        ("products",): (1, 0),
+        ("products", 0): (2, 4),
+        ("products", 0, "xyz.owl"): (2, 4),
+        ("products", 1): (3, 4),
+        ("products", 1, "xyz.obo"): (3, 4),
+        ("products", 1, "title"): (4, 4),
+        ("entries",): (5, 0),
+        ("entries", 0): (6, 2),
+        ("entries", 0, "exact"): (6, 2),
+        ("entries", 0, "replacement"): (7, 2),
+    }
+
+
+def test_position_index_of_flow_collections():
+    _, positions = parsing.load_with_positions("a: {b: 1, c: [x, y]}\n")
+    assert positions[("a",)] == (0, 0)
+    assert positions[("a", "b")] == (0, 4)
+    assert positions[("a", "c")] == (0, 10)
+    assert positions[("a", "c", 1)] == (0, 17)
+
+
+def test_position_index_indexes_aliased_nodes_once():
+    _, positions = parsing.load_with_positions("a: &anchor\n  b: 1\nc: *anchor\n")
+    assert positions[("a", "b")] == (1, 2)
+    assert ("c",) in positions
+    assert ("c", "b") not in positions
+
+
+def test_position_index_terminates_on_recursive_aliases():
+    _, positions = parsing.load_with_positions("a: &loop\n  - *loop\n")
+    assert set(positions) == {("a",), ("a", 0)}
+
+
+def test_position_index_of_scalars_and_empty_documents():
+    assert parsing.position_index("just a string") == {}
+    assert parsing.position_index(None) == {}
+
+
+def test_load_returns_plain_data():
+    data = parsing.load("a: [1, 2]\nb: {c: d}\n")
+    assert data == {"a": [1, 2], "b": {"c": "d"}}
+    assert type(data) is dict
+
+
+def test_each_thread_has_its_own_loader():
+    instances = []
+
+    def record():
+        instances.append(parsing._instance("safe"))
+        instances.append(parsing._instance("safe"))
+
+    thread = threading.Thread(target=record)
+    thread.start()
+    thread.join()
+    assert instances[0] is instances[1]
+    assert parsing._instance("safe") is not instances[0]
@@ -0,0 +1,132 @@
+import pytest
+import validation
+
+PURL_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "required": ["idspace", "base_url"],
+    "additionalProperties": False,
+    "properties": {
+        "idspace": {"type": "string"},
+        "base_url": {"type": "string", "pattern": "^/obo/"},
+        "products": {
+            "type": "array",
+            "items": {"type": "object", "additionalProperties": {"type": "string"}},
+        },
+    },
+}
+
+REGISTRY_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "properties": {
+        "id": {"type": "string", "level": "error"},
+        "title": {"type": "string"},
+        "description": {"type": "string", "description": "A short description"},
+    },
+}
+
+PURL_CONFIG = """idspace: XYZ
+base_url: /obo/xyz
+products:
+- xyz.owl: http://example.org/xyz.owl
+- xyz.obo: http://example.org/xyz.obo
+"""
+
+
+@pytest.fixture(scope="module")
+def validators():
+    cache = validation.ValidatorCache()
+    return {
+        "purl": cache.get("purl", PURL_SCHEMA),
+        "registry": cache.get("registry", REGISTRY_SCHEMA),
+    }
+
+
+def test_valid_config_has_no_results(validators):
+    assert validation.check_config("purl", PURL_CONFIG, validators["purl"], all_errors=True) == []
+
+
+def test_all_errors_are_reported_in_line_order(validators):
+    code = PURL_CONFIG.replace("base_url: /obo/xyz", "base_url: /xyz").replace(
+        "- xyz.obo: http://example.org/xyz.obo", "- xyz.obo: 12"
+    )
+    code += "tracker: http://example.org/issues\n"
+
+    results = validation.check_config("purl", code, validators["purl"], all_errors=True)
+    assert [r["line_number"] for r in results] == [2, 5, 6]
+    assert [r["result_type"] for r in results] == ["error"] * 3
+    assert "'/xyz' does not match '^/obo/'" in results[0]["summary"]
+    assert "12 is not of type 'string'" in results[1]["summary"]
+    assert "'tracker' was unexpected" in results[2]["summary"]
+
+
+def test_only_the_best_match_is_reported_by_default(validators):
+    code = PURL_CONFIG.replace("base_url: /obo/xyz", "base_url: /xyz")
+    code += "tracker: http://example.org/issues\n"
+    results = validation.check_config("purl", code, validators["purl"])
+    assert len(results) == 1
+
+
+def test_missing_property_is_reported_at_its_parent(validators):
+    code = "idspace: XYZ\n"
+    results = validation.check_config("purl", code, validators["purl"], all_errors=True)
+    assert [r["line_number"] for r in results] == [-1]
+    assert "'base_url' is a required property" in results[0]["summary"]
+
+
+def test_yaml_errors_are_reported_with_their_line(validators):
+    code = "idspace: XYZ\nbase_url: [/obo/xyz\n"
+    results = validation.check_config("purl", code, validators["purl"], all_errors=True)
+    assert len(results) == 1
+    assert results[0]["summary"] == "YAML parsing error"
+    assert results[0]["line_number"] == 3
+
+
+def test_duplicate_keys_are_yaml_errors(validators):
+    code = PURL_CONFIG + "idspace: ABC\n"
+    results = validation.check_config("purl", code, validators["purl"], all_errors=True)
+    assert [r["summary"] for r in results] == ["YAML parsing error"]
+
+
+def test_registry_levels_and_descriptions(validators):
+    code = "---\nid: 12\ntitle: 13\ndescription: 14\n---\n\nSome text\n"
+    results = validation.check_config("registry", code, validators["registry"], all_errors=True)
+    assert [(r["line_number"], r["result_type"]) for r in results] == [
+        (2, "error"),
+        (3, "warning"),
+        (4, "warning"),
+    ]
+    assert results[2]["summary"].endswith("(A short description)")
+    assert validation.most_severe(results)["line_number"] == 2
+
+
+def test_registry_levels_are_lowered_for_obsolete_entries(validators):
+    code = "---\nid: 12\ntitle: 13\nis_obsolete: true\n---\n"
+    results = validation.check_config("registry", code, validators["registry"], all_errors=True)
+    assert [r["result_type"] for r in results] == ["warning", "info"]
+
+
+def test_registry_config_without_front_matter_is_malformed(validators):
+    with pytest.raises(validation.MalformedConfig):
+        validation.check_config("registry", "id: xyz\n", validators["registry"])
+
+
+def test_error_line_falls_back_to_enclosing_item():
+    positions = {("products",): (2, 0), ("products", 1): (4, 2)}
+
+    class Error:
+        validator = "type"
+        absolute_path = ["products", 1, "xyz.obo"]
+
+    assert validation.find_schema_error_line(Error(), positions) == 5
+    Error.absolute_path = ["other"]
+    assert validation.find_schema_error_line(Error(), positions) == -1
+
+
+def test_validators_are_only_compiled_for_new_schemas():
+    cache = validation.ValidatorCache()
+    first = cache.get("purl", PURL_SCHEMA)
+    assert cache.get("purl", PURL_SCHEMA) is first
+    assert cache.get("purl", dict(PURL_SCHEMA)) is not first
+    assert cache.compilations == 2
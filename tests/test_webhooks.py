@@ -0,0 +1,133 @@
+import json
+import os
+
+import pytest
+import webhooks
+
+PAYLOADS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tools", "webhook_payloads")
+SECRET = "test-webhook-secret"
+PURL_REPO = "OBOFoundry/purl.obolibrary.org"
+
+
+def load_payload(event):
+    with open(os.path.join(PAYLOADS, f"{event}.json")) as f:
+        return json.load(f)
+
+
+def deliver(client, event, payload, secret=SECRET):
+    body = json.dumps(payload).encode("utf-8")
+    return client.post(
+        "/github_webhook",
+        data=body,
+        content_type="application/json",
+        headers={"X-GitHub-Event": event, "X-Hub-Signature-256": webhooks.sign(secret, body)},
+    )
+
+
+def cache_response(server, endpoint):
+    server.github_cache.entries.set(("scope", endpoint, ()), object())
+
+
+def cached_endpoints(server):
+    return {key[1] for key in server.github_cache.entries._entries}
+
+
+def test_verify_signature():
+    body = b'{"zen": "Keep it logically awesome."}'
+    signature = webhooks.sign(SECRET, body)
+    assert signature.startswith("sha256=")
+    assert webhooks.verify_signature(SECRET, body, signature)
+    assert not webhooks.verify_signature(SECRET, body + b" ", signature)
+    assert not webhooks.verify_signature("another-secret", body, signature)
+    assert not webhooks.verify_signature(SECRET, body, None)
+    assert not webhooks.verify_signature(None, body, signature)
+
+
+def test_pushed_files_and_truncation():
+    payload = {
+        "commits": [
+            {"added": ["config/a.yml"], "modified": [], "removed": []},
+            {"added": [], "modified": ["config/b.yml"], "removed": ["README.md"]},
+        ]
+    }
+    assert webhooks.pushed_files(payload) == {"config/a.yml", "config/b.yml", "README.md"}
+    assert not webhooks.is_truncated(payload)
+    assert webhooks.is_truncated({"commits": [{}] * webhooks.MAX_PUSH_COMMITS})
+    assert webhooks.in_directory("config/a.yml", "config")
+    assert not webhooks.in_directory("config/sub/a.yml", "config")
+
+
+@pytest.mark.parametrize("event", ["push", "issues", "pull_request"])
+def test_sample_payloads_are_well_formed(event):
+    assert webhooks.is_well_formed(event, load_payload(event))
+
+
+def test_webhook_rejects_invalid_signature(client):
+    response = deliver(client, "push", load_payload("push"), secret="wrong-secret")
+    assert response.status_code == 403
+
+
+def test_webhook_is_disabled_without_secret(server, client, monkeypatch):
+    monkeypatch.setitem(server.app.config, "GITHUB_WEBHOOK_SECRET", None)
+    assert deliver(client, "push", load_payload("push")).status_code == 404
+
+
+def test_webhook_answers_ping_and_ignores_other_events(client):
+    assert deliver(client, "ping", {"zen": "Practicality beats purity."}).status_code == 200
+    assert deliver(client, "star", {"repository": {}}).status_code == 202
+
+
+@pytest.mark.parametrize(
+    "event,payload",
+    [
+        ("push", {"ref": "refs/heads/master"}),
+        ("issues", {"action": "opened", "repository": {"full_name": PURL_REPO}}),
+        ("pull_request", {"action": "closed", "repository": {"full_name": PURL_REPO}}),
+        ("issues", {"repository": {"full_name": PURL_REPO}, "issue": "1234"}),
+    ],
+)
+def test_webhook_rejects_malformed_payloads(client, event, payload):
+    response = deliver(client, event, payload)
+    assert response.status_code == 400
+    assert response.get_data(as_text=True) == "Malformed webhook payload"
+
+
+def test_push_invalidates_changed_files_and_listing(server, client):
+    contents = f"/repos/{PURL_REPO}/contents/config"
+    server.github_cache.entries.clear()
+    for endpoint in [contents, f"{contents}/go.yml", f"{contents}/obi.yml"]:
+        cache_response(server, endpoint)
+    server.index_cache.entries.set("listing", ("value", None, 0))
+
+    assert deliver(client, "push", load_payload("push")).status_code == 204
+    assert cached_endpoints(server) == {f"{contents}/obi.yml"}
+    assert len(server.index_cache.entries) == 0
+
+
+def test_push_to_other_branch_keeps_cached_files(server, client):
+    contents = f"/repos/{PURL_REPO}/contents/config"
+    server.github_cache.entries.clear()
+    cache_response(server, f"{contents}/go.yml")
+    payload = dict(load_payload("push"), ref="refs/heads/some-branch")
+
+    assert deliver(client, "push", payload).status_code == 204
+    assert cached_endpoints(server) == {f"{contents}/go.yml"}
+
+
+def test_issues_event_invalidates_issue_listing(server, client):
+    issues = "/repos/OBOFoundry/OBOFoundry.github.io/issues"
+    server.github_cache.entries.clear()
+    for endpoint in [issues, f"{issues}/1234", f"{issues}/99"]:
+        cache_response(server, endpoint)
+
+    assert deliver(client, "issues", load_payload("issues")).status_code == 204
+    assert cached_endpoints(server) == {f"{issues}/99"}
+
+
+def test_merged_pull_request_invalidates_listing(server, client):
+    contents = "/repos/OBOFoundry/OBOFoundry.github.io/contents/ontology"
+    server.github_cache.entries.clear()
+    cache_response(server, contents)
+
+    assert deliver(client, "pull_request", load_payload("pull_request")).status_code == 204
+    assert contents not in cached_endpoints(server)
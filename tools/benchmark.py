@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Benchmarks the parsing and validation of PURL and REGISTRY configuration files, both by calling
+# the underlying functions directly and by POSTing to the editor's /validate endpoint through
+# Flask's test client. Synthetic configurations of increasing size (measured in `entries` for PURL
+# configs and `products` for REGISTRY configs), both valid and invalid, are used. For example:
+#
+# python3 tools/benchmark.py --save baseline.json
+# ... make some changes ...
+# python3 tools/benchmark.py --compare baseline.json
+#
+# The schemas are retrieved from GitHub, as the editor does, unless local copies are given with
+# --purl-schema and --registry-schema. The benchmarks use a temporary database, and never call
+# GitHub otherwise. When comparing with a baseline, the exit status is 1 if any benchmark's median
+# time has regressed by more than the --threshold, and 0 otherwise.
+
+# Allow this script to be run from any directory:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+# The editor must not share the database of a running editor, nor refresh its schemas while
+# benchmarks are running:
+os.environ["DATABASE_URI"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+os.environ["METADATA_REFRESH_INTERVAL"] = "0"
+os.environ.setdefault("FLASK_SECRET_KEY", "benchmark")
+
+import parsing  # noqa: E402
+import server  # noqa: E402
+import validation  # noqa: E402
+
+# The sizes of the configurations that are benchmarked by default:
+DEFAULT_SIZES = [10, 100, 1000]
+
+# Measure the editor's code rather than its debug logging:
+server.logger.setLevel(logging.WARNING)
+
+# The benchmarked functions, by name. Each is called with the editor type and the code of a config:
+TARGETS = {
+    "parse": lambda editor_type, code: parsing.load(validation.yaml_section(editor_type, code)),
+    "parse_positions": lambda editor_type, code: parsing.load_with_positions(
+        validation.yaml_section(editor_type, code)
+    ),
+    "check": lambda editor_type, code: validation.check_config(
+        editor_type, code, validator(editor_type)
+    ),
+    "check_all": lambda editor_type, code: validation.check_config(
+        editor_type, code, validator(editor_type), all_errors=True
+    ),
+    "endpoint": lambda editor_type, code: post_validate(editor_type, code),
+}
+
+
+def validator(editor_type):
+    snapshot = server.metadata.snapshot
+    return server.validators.get(editor_type, getattr(snapshot, f"{editor_type}_schema"))
+
+
+def purl_config(size, valid):
+    """
+    Return a PURL configuration with the given number of entries (and a tenth as many products).
+    If it is not to be valid, every tenth entry has a misspelt key instead of its replacement.
+    """
+    lines = [
+        "# PURL configuration for http://purl.obolibrary.org/obo/bench",
+        "",
+        "idspace: BENCH",
+        "base_url: /obo/bench",
+        "",
+        "products:",
+    ]
+    for i in range(max(1, size // 10)):
+        lines.append(
+            f"- bench{i}.owl: https://raw.githubusercontent.com/bench/bench/v{i}/bench.owl"
+        )
+    lines += ["", "term_browser: ontobee", "example_terms:", "- BENCH_0000001", "", "entries:"]
+    for i in range(size):
+        lines.append(f"- prefix: /releases/{i}/")
+        key = "replacment" if not valid and i % 10 == 9 else "replacement"
+        lines.append(f"  {key}: https://github.com/bench/bench/releases/download/v{i}/")
+    return "\n".join(lines) + "\n"
+
+
+def registry_config(size, valid):
+    """
+    Return a REGISTRY configuration with the given number of products. If it is not to be valid,
+    every tenth product has no id and a list as its ontology_purl.
+    """
+    lines = [
+        "---",
+        "layout: ontology_detail",
+        "id: bench",
+        "title: Benchmark Ontology",
+        "description: A synthetic ontology used to benchmark the metadata editor.",
+        "domain: upper",
+        "homepage: https://example.org/bench",
+        "contact:",
+        "  email: bench@example.org",
+        "  label: Bench Maintainer",
+        "  github: bench",
+        "license:",
+        "  url: https://creativecommons.org/licenses/by/4.0/",
+        "  label: CC BY 4.0",
+        "activity_status: active",
+        "products:",
+    ]
+    for i in range(size):
+        if not valid and i % 10 == 9:
+            lines.append(f"- title: Benchmark product {i}")
+            lines.append(f"  ontology_purl: [http://purl.obolibrary.org/obo/bench/{i}.owl]")
+        else:
+            lines.append(f"- id: bench/bench-{i}.owl")
+            lines.append(f"  title: Benchmark product {i}")
+            lines.append(f"  ontology_purl: http://purl.obolibrary.org/obo/bench/bench-{i}.owl")
+    lines += ["---", "", "A synthetic ontology used to benchmark the metadata editor.", ""]
+    return "\n".join(lines)
+
+
+configs = {"purl": purl_config, "registry": registry_config}
+
+
+def post_validate(editor_type, code):
+    # Vary the code on every call, so that it is validated rather than found in the cache:
+    post_validate.calls += 1
+    code += f"\n# {post_validate.calls}\n"
+    response = client.post(
+        "/validate", data={"code": code, "editor_type": editor_type, "all_errors": "true"}
+    )
+    if response.status_code not in (200, 400):
+        raise RuntimeError(f"/validate returned {response.status_code}: {response.data}")
+
+
+post_validate.calls = 0
+client = server.app.test_client()
+
+
+def percentile(times, p):
+    """
+    Return the p'th percentile of the given sorted times, interpolating between the nearest two.
+    """
+    position = (len(times) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(times) - 1)
+    return times[lower] + (times[upper] - times[lower]) * (position - lower)
+
+
+def run(fn, editor_type, code, min_runs, min_time):
+    """
+    Time calls of the given function on the given code, until it has been called at least min_runs
+    times and for at least min_time seconds, and then measure its peak memory use in one more call.
+    Returns a dictionary of statistics.
+    """
+    times = []
+    started = time.perf_counter()
+    while len(times) < min_runs or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        fn(editor_type, code)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn(editor_type, code)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        "runs": len(times),
+        "bytes": len(code.encode("utf-8")),
+        "ops_per_sec": len(times) / sum(times),
+        "mb_per_sec": len(times) * len(code.encode("utf-8")) / sum(times) / 1e6,
+        "p50": percentile(times, 50),
+        "p90": percentile(times, 90),
+        "p99": percentile(times, 99),
+        "peak_kib": peak / 1024,
+    }
+
+
+def load_schemas(args):
+    """
+    Replace the editor's schemas with the local copies given on the command line, if any, and check
+    that a schema is available for every type of config.
+    """
+    replacements = {}
+    for editor_type in configs:
+        path = getattr(args, f"{editor_type}_schema")
+        if path:
+            with open(path, encoding="utf-8") as f:
+                replacements[f"{editor_type}_schema"] = json.load(f)
+    if replacements:
+        server.metadata.snapshot = server.metadata.snapshot.replace(**replacements)
+    for editor_type in configs:
+        if not getattr(server.metadata.snapshot, f"{editor_type}_schema"):
+            sys.exit(f"Could not retrieve the {editor_type} schema; use --{editor_type}-schema")
+
+
+def log_in():
+    """
+    Log the test client in as a (fake) user of the editor, so that it may call /validate.
+    """
+    user = server.User("benchmark")
+    user.github_login = "benchmark"
+    server.db_session.add(user)
+    server.db_session.commit()
+    with client.session_transaction() as session:
+        session["user_id"] = user.id
+    server.db_session.remove()
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the change in the median time of every benchmark in both the given results and baseline,
+    and return the number of benchmarks that have regressed by more than the given threshold.
+    """
+    regressions = 0
+    print(f"\nCompared with the baseline from {baseline['created']}:")
+    for name, stats in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = stats["p50"] / before["p50"]
+        verdict = ""
+        if ratio > 1 + threshold:
+            verdict = "REGRESSION"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            verdict = "improvement"
+        print(
+            f"{name:<40} {before['p50'] * 1000:>9.2f} -> {stats['p50'] * 1000:>9.2f} ms "
+            f"({(ratio - 1) * 100:+.1f}%) {verdict}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parsing and validation of PURL and REGISTRY configurations"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=DEFAULT_SIZES,
+        help="The sizes of config to benchmark, separated by commas (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--filter", help="Only run the benchmarks whose names match this regular expression"
+    )
+    parser.add_argument(
+        "--min-runs",
+        type=int,
+        default=5,
+        help="The minimum number of times to run each benchmark (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=1.0,
+        help="The minimum number of seconds to run each benchmark for (default: %(default)s)",
+    )
+    parser.add_argument("--purl-schema", help="A local copy of the PURL schema to use")
+    parser.add_argument("--registry-schema", help="A local copy of the REGISTRY schema to use")
+    parser.add_argument("--save", help="Save the results to this file, as a baseline")
+    parser.add_argument("--compare", help="Compare the results with the baseline in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="The proportional slowdown considered to be a regression (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    load_schemas(args)
+    log_in()
+
+    print(
+        f"{'benchmark':<40} {'runs':>6} {'ops/s':>9} {'MB/s':>7} {'p50 ms':>9} {'p90 ms':>9} "
+        f"{'p99 ms':>9} {'peak KiB':>9}"
+    )
+    results = {}
+    for editor_type, make_config in configs.items():
+        for size in args.sizes:
+            for valid in (True, False):
+                code = make_config(size, valid)
+                for target, fn in TARGETS.items():
+                    name = f"{editor_type}/{size}/{'valid' if valid else 'invalid'}/{target}"
+                    if args.filter and not re.search(args.filter, name):
+                        continue
+                    stats = results[name] = run(fn, editor_type, code, args.min_runs, args.min_time)
+                    print(
+                        f"{name:<40} {stats['runs']:>6} {stats['ops_per_sec']:>9.1f} "
+                        f"{stats['mb_per_sec']:>7.2f} {stats['p50'] * 1000:>9.2f} "
+                        f"{stats['p90'] * 1000:>9.2f} {stats['p99'] * 1000:>9.2f} "
+                        f"{stats['peak_kib']:>9.0f}",
+                        flush=True,
+                    )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+            print(file=f)
+        print(f"\nSaved the results to {args.save}")
+
+    if baseline is not None:
+        return 1 if compare(results, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+
+# Allow this script to be run from any directory:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import assets  # noqa: E402
+import config  # noqa: E402
+
+# Builds the bundles of static assets listed in ASSET_BUNDLES (see config.py), along with their
+# precompressed variants, in ASSET_BUILD_DIR. The editor also does this when it starts, but running
+# this when the editor is deployed means that it does not have to (and that the build directory need
+# not be writable by the editor). For example:
+#
+# python3 tools/build_assets.py
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the editor's bundles of static assets")
+    parser.add_argument(
+        "--build-dir",
+        default=config.ASSET_BUILD_DIR,
+        help="The directory to write the bundles to (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    static_assets = assets.Assets(
+        config.PWD, bundles=config.ASSET_BUNDLES, build_dir=args.build_dir
+    )
+    built = static_assets.build()
+    for name in static_assets.bundles:
+        location = os.path.join(args.build_dir, name)
+        sizes = [f"{os.path.getsize(location)} bytes"]
+        for encoding, extension in assets.ENCODINGS:
+            if os.path.isfile(location + extension):
+                sizes.append(f"{os.path.getsize(location + extension)} bytes with {encoding}")
+        status = "built" if name in built else "unchanged"
+        print(f"{name}: {status}, {', '.join(sizes)}")
+    if "br" not in assets.COMPRESSORS:
+        print("The brotli package is not installed, so no brotli variants were built")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import posixpath
+import random
+import threading
+import time
+import zlib
+
+from flask import Flask, Response, abort, g, jsonify, redirect, request
+from urllib.parse import urlencode
+
+# A stand-in for GitHub that implements the parts of its web site (raw files), REST API and OAuth
+# API that the editor uses, so that the editor can be run, and load tested (see load_test.py),
+# without a network connection or a GitHub account. The repositories are seeded from directories
+# of fixture files, which are never modified: new trees, commits, branches, issues and pull
+# requests are only kept in memory. For example:
+#
+# python3 tools/fake_github.py --port 5001 --latency 100 --write-latency 500
+#
+# and then run the editor with:
+#
+# export GITHUB_URL=http://localhost:5001 GITHUB_API_URL=http://localhost:5001
+# export GITHUB_CLIENT_ID=fake GITHUB_CLIENT_SECRET=fake GITHUB_APP_STATE=fake
+# export FLASK_SECRET_KEY=... FLASK_HOST=http://localhost:5000
+# python3 -m flask run
+#
+# Anybody can log in with any GitHub login. The access token issued to a user is 'fake-<login>'.
+# Each token has its own rate limit budget, which behaves like GitHub's: conditional requests that
+# are answered with 304 Not Modified are free, and once the budget is spent, requests fail with 403
+# until it is reset. A proportion of requests can also be made to hit the secondary rate limit.
+#
+# By default the repositories are seeded from the fixtures in fake_github_repos/, which contains a
+# directory for each owner, containing a directory for each repository. Issues are seeded from a
+# JSON file named after the repository (e.g. OBOFoundry/OBOFoundry.github.io.issues.json). Local
+# checkouts of real repositories can be used instead with --repo, e.g.
+# --repo OBOFoundry/purl.obolibrary.org=../purl.obolibrary.org
+
+# The location of the default fixture repositories:
+FIXTURES = os.path.join(os.path.dirname(os.path.realpath(__file__)), "fake_github_repos")
+
+
+def git_sha(kind, data):
+    """
+    Return the sha of a git object of the given kind with the given contents, as git computes it.
+    """
+    return hashlib.sha1(f"{kind} {len(data)}\0".encode("utf-8") + data).hexdigest()
+
+
+class FakeRepo:
+    """
+    A repository of the fake GitHub. Its master branch contains the files of a fixture directory;
+    the trees and commits of other branches only record the files changed in them.
+    """
+
+    def __init__(self, full_name, root, issues=()):
+        self.full_name = full_name
+        self.root = root
+        self.lock = threading.Lock()
+        self.tree = git_sha("tree", full_name.encode("utf-8"))
+        self.trees = {self.tree: (None, {})}
+        self.head = git_sha("commit", self.tree.encode("utf-8"))
+        self.commits = {self.head: {"tree": self.tree, "parents": [], "message": "Initial commit"}}
+        self.refs = {"refs/heads/master": self.head}
+        self.issues = list(issues)
+        self.pulls = []
+
+    def locate(self, path):
+        """
+        Return the location in the fixture directory of the given path, or None if it is outside.
+        """
+        root = os.path.realpath(self.root)
+        full_path = os.path.realpath(os.path.join(root, path))
+        return full_path if os.path.commonpath([root, full_path]) == root else None
+
+    def read(self, path):
+        """
+        Return the contents of the file at the given path on master, or None if there is none.
+        """
+        full_path = self.locate(path)
+        if full_path is None or not os.path.isfile(full_path):
+            return None
+        with open(full_path, "rb") as f:
+            return f.read()
+
+    def list(self, path):
+        """
+        Return the entries of the directory at the given path on master, in the form returned by
+        GitHub's contents API, or None if there is no such directory.
+        """
+        full_path = self.locate(path)
+        if full_path is None or not os.path.isdir(full_path):
+            return None
+        entries = []
+        for name in sorted(os.listdir(full_path)):
+            entry_path = f"{path.strip('/')}/{name}".lstrip("/")
+            if os.path.isdir(os.path.join(full_path, name)):
+                entries.append({"type": "dir", "name": name, "path": entry_path})
+            else:
+                entries.append({"type": "file", "name": name, "path": entry_path})
+        return entries
+
+    def tree_file(self, tree_sha, path):
+        """
+        Return the contents of the file at the given path in the given tree.
+        """
+        while tree_sha is not None:
+            base, files = self.trees[tree_sha]
+            if path in files:
+                return files[path]
+            if base is None:
+                return self.read(path)
+            tree_sha = base
+
+    def list_tree(self, tree_sha, directory):
+        """
+        Return the files in the given directory of the given tree, as a dictionary from name to
+        contents, or None if there is no such directory.
+        """
+        directory = directory.strip("/")
+        overlays = []
+        with self.lock:
+            while tree_sha is not None:
+                base, files = self.trees[tree_sha]
+                overlays.append(files)
+                tree_sha = base
+        listing = self.list(directory)
+        files = {
+            entry["name"]: self.read(entry["path"])
+            for entry in listing or []
+            if entry["type"] == "file"
+        }
+        for overlay in reversed(overlays):
+            for path, data in overlay.items():
+                if posixpath.dirname(path) == directory:
+                    files[posixpath.basename(path)] = data
+        return files if files or listing is not None else None
+
+    def create_tree(self, base_tree, entries):
+        """
+        Create a tree in which the files in the given entries replace those in the given base tree,
+        and return its sha. As in git, a tree with the same contents as its base has the same sha.
+        """
+        files = {e["path"]: e["content"].encode("utf-8") for e in entries}
+        with self.lock:
+            if base_tree not in self.trees:
+                return None
+            if all(self.tree_file(base_tree, path) == data for path, data in files.items()):
+                return base_tree
+            key = json.dumps([base_tree, sorted((p, d.decode()) for p, d in files.items())])
+            sha = git_sha("tree", key.encode("utf-8"))
+            self.trees[sha] = (base_tree, files)
+            return sha
+
+
+class FakeGitHub:
+    """
+    The state of the fake GitHub: its repositories, and the rate limit budget of each token.
+    """
+
+    def __init__(self, repos, rate_limit=5000, rate_limit_window=3600, secondary_rate=0.0):
+        self.repos = repos
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.secondary_rate = secondary_rate
+        self.budgets = {}
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def charge(self, token):
+        """
+        Spend one request from the given token's budget, and return the rate limit headers to send
+        with the response, along with whether the budget had already been spent.
+        """
+        now = int(time.time())
+        with self.lock:
+            remaining, reset = self.budgets.get(
+                token, (self.rate_limit, now + self.rate_limit_window)
+            )
+            if now >= reset:
+                remaining, reset = self.rate_limit, now + self.rate_limit_window
+            exhausted = remaining <= 0
+            if not exhausted:
+                remaining -= 1
+            self.budgets[token] = (remaining, reset)
+        headers = {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Used": str(self.rate_limit - remaining),
+            "X-RateLimit-Resource": "core",
+        }
+        return headers, exhausted
+
+    def refund(self, token):
+        with self.lock:
+            remaining, reset = self.budgets[token]
+            self.budgets[token] = (min(remaining + 1, self.rate_limit), reset)
+
+    def count(self, name):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+
+def load_repos(fixtures, extra_repos):
+    """
+    Return the repositories seeded from the given fixtures directory, and from the given dictionary
+    of extra repositories (from full name to the directory of a checkout).
+    """
+    locations = {}
+    if fixtures:
+        for owner in sorted(os.listdir(fixtures)):
+            if not os.path.isdir(os.path.join(fixtures, owner)):
+                continue
+            for name in sorted(os.listdir(os.path.join(fixtures, owner))):
+                if os.path.isdir(os.path.join(fixtures, owner, name)):
+                    locations[f"{owner}/{name}"] = os.path.join(fixtures, owner, name)
+    locations.update(extra_repos)
+
+    repos = {}
+    for full_name, root in locations.items():
+        issues = []
+        issues_file = os.path.join(fixtures or "", f"{full_name}.issues.json")
+        if fixtures and os.path.isfile(issues_file):
+            with open(issues_file, encoding="utf-8") as f:
+                issues = json.load(f)
+        repos[full_name] = FakeRepo(full_name, root, issues)
+    return repos
+
+
+def create_app(fake, latency=0.0, jitter=0.0, write_latency=None):
+    """
+    Return a Flask application serving the given fake GitHub. Every call to the API is delayed by
+    the given latency plus a random amount of up to the given jitter (all in seconds); calls that
+    write to a repository are delayed by the write_latency instead, if it is given.
+    """
+    app = Flask(__name__)
+
+    def delay():
+        base = write_latency if write_latency is not None and request.method != "GET" else latency
+        if base or jitter:
+            time.sleep(base + random.uniform(0, jitter))
+
+    def repo_or_404(owner, repo):
+        found = fake.repos.get(f"{owner}/{repo}")
+        if found is None:
+            abort(404)
+        return found
+
+    def reply(data, status=200):
+        """
+        Return the given data as JSON, answering conditional requests with 304 Not Modified.
+        """
+        body = json.dumps(data)
+        etag = f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+        if request.method == "GET" and request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers={"ETag": etag})
+        response = Response(body, status=status, mimetype="application/json")
+        if request.method == "GET":
+            response.headers["ETag"] = etag
+        return response
+
+    @app.before_request
+    def api_call():
+        """
+        Authenticate, delay and rate limit every call to the API.
+        """
+        if request.path.startswith("/login/oauth") or request.path.startswith("/_fake"):
+            return None
+        if "/raw/" in request.path:
+            delay()
+            return None
+
+        fake.count(f"{request.method} {request.url_rule.rule if request.url_rule else 'unknown'}")
+        auth = request.headers.get("Authorization", "")
+        token = auth.split(" ", 1)[1] if " " in auth else None
+        if not token or not token.startswith("fake-"):
+            return jsonify({"message": "Requires authentication"}), 401
+        g.token = token
+        g.rate_limit_headers, exhausted = fake.charge(token)
+        delay()
+        if exhausted:
+            return jsonify({"message": "API rate limit exceeded"}), 403
+        if fake.secondary_rate and random.random() < fake.secondary_rate:
+            return (
+                jsonify({"message": "You have exceeded a secondary rate limit"}),
+                403,
+                {"Retry-After": "1"},
+            )
+        return None
+
+    @app.after_request
+    def add_rate_limit_headers(response):
+        headers = g.get("rate_limit_headers")
+        if headers:
+            # As on GitHub, conditional requests answered with 304 Not Modified are free:
+            if response.status_code == 304:
+                fake.refund(g.token)
+                headers = dict(headers)
+                headers["X-RateLimit-Remaining"] = str(int(headers["X-RateLimit-Remaining"]) + 1)
+                headers["X-RateLimit-Used"] = str(int(headers["X-RateLimit-Used"]) - 1)
+            response.headers.update(headers)
+        return response
+
+    ## OAuth
+
+    @app.route("/login/oauth/authorize")
+    def authorize():
+        """
+        Ask for the login of the user to authenticate as.
+        """
+        return (
+            "<html><body><form action='/login/oauth/authorize/grant'>"
+            "<p>Log in to the fake GitHub as: <input name='login' value='octocat'>"
+            f"<input type='hidden' name='redirect_uri' value='{request.args['redirect_uri']}'>"
+            f"<input type='hidden' name='state' value='{request.args.get('state', '')}'>"
+            "<input type='submit' value='Authorize'></p></form></body></html>"
+        )
+
+    @app.route("/login/oauth/authorize/grant")
+    def grant():
+        """
+        Redirect back to the application with a code identifying the given user.
+        """
+        params = {"code": request.args["login"], "state": request.args.get("state", "")}
+        return redirect(f"{request.args['redirect_uri']}?{urlencode(params)}")
+
+    @app.route("/login/oauth/access_token", methods=["POST"])
+    def access_token():
+        params = {
+            "access_token": f"fake-{request.form['code']}",
+            "scope": "",
+            "token_type": "bearer",
+        }
+        return Response(urlencode(params), mimetype="application/x-www-form-urlencoded")
+
+    ## Raw files
+
+    @app.route("/<owner>/<repo>/raw/<ref>/<path:path>")
+    def raw(owner, repo, ref, path):
+        data = repo_or_404(owner, repo).read(path)
+        if data is None:
+            abort(404)
+        etag = f'"{git_sha("blob", data)}"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=304, headers={"ETag": etag})
+        return Response(data, mimetype="text/plain", headers={"ETag": etag})
+
+    ## REST API
+
+    @app.route("/user")
+    def user():
+        login = g.token[len("fake-") :]
+        return reply(
+            {"login": login, "id": zlib.crc32(login.encode("utf-8")), "type": "User", "name": login}
+        )
+
+    @app.route("/repos/<owner>/<repo>")
+    def get_repo(owner, repo):
+        found = repo_or_404(owner, repo)
+        return reply({"full_name": found.full_name, "default_branch": "master"})
+
+    @app.route("/repos/<owner>/<repo>/contents/", defaults={"path": ""})
+    @app.route("/repos/<owner>/<repo>/contents/<path:path>")
+    def contents(owner, repo, path):
+        found = repo_or_404(owner, repo)
+        entries = found.list(path)
+        if entries is not None:
+            for entry in entries:
+                if entry["type"] == "file":
+                    entry["sha"] = git_sha("blob", found.read(entry["path"]))
+            return reply(entries)
+        data = found.read(path)
+        if data is None:
+            return reply({"message": "Not Found"}, 404)
+        return reply(
+            {
+                "type": "file",
+                "name": posixpath.basename(path),
+                "path": path,
+                "sha": git_sha("blob", data),
+                "size": len(data),
+                "encoding": "base64",
+                "content": base64.b64encode(data).decode("ascii"),
+            }
+        )
+
+    @app.route("/repos/<owner>/<repo>/commits/<path:ref>")
+    def commit(owner, repo, ref):
+        found = repo_or_404(owner, repo)
+        sha = found.refs.get(f"refs/heads/{ref}", ref)
+        if sha not in found.commits:
+            return reply({"message": "No commit found"}, 422)
+        return reply({"sha": sha, "commit": {"tree": {"sha": found.commits[sha]["tree"]}}})
+
+    @app.route("/repos/<owner>/<repo>/git/trees/<path:tree>")
+    def get_tree(owner, repo, tree):
+        # The tree may be given as <tree, commit or branch>:<directory>, as git allows:
+        found = repo_or_404(owner, repo)
+        ref, _, directory = tree.partition(":")
+        sha = found.refs.get(f"refs/heads/{ref}", ref)
+        if sha in found.commits:
+            sha = found.commits[sha]["tree"]
+        files = found.list_tree(sha, directory) if sha in found.trees else None
+        if files is None:
+            return reply({"message": "Not Found"}, 404)
+        entries = [
+            {"path": name, "mode": "100644", "type": "blob", "sha": git_sha("blob", data)}
+            for name, data in sorted(files.items())
+        ]
+        return reply({"sha": tree, "tree": entries, "truncated": False})
+
+    @app.route("/repos/<owner>/<repo>/git/trees", methods=["POST"])
+    def create_tree(owner, repo):
+        found = repo_or_404(owner, repo)
+        data = request.get_json()
+        sha = found.create_tree(data.get("base_tree"), data.get("tree", []))
+        if sha is None:
+            return reply({"message": "Invalid base_tree"}, 422)
+        return reply({"sha": sha}, 201)
+
+    @app.route("/repos/<owner>/<repo>/git/commits", methods=["POST"])
+    def create_commit(owner, repo):
+        found = repo_or_404(owner, repo)
+        data = request.get_json()
+        if data.get("tree") not in found.trees:
+            return reply({"message": "Invalid tree"}, 422)
+        sha = git_sha("commit", json.dumps(data, sort_keys=True).encode("utf-8"))
+        with found.lock:
+            found.commits[sha] = data
+        return reply({"sha": sha, "tree": {"sha": data["tree"]}}, 201)
+
+    @app.route("/repos/<owner>/<repo>/git/ref/<path:ref>")
+    def get_ref(owner, repo, ref):
+        found = repo_or_404(owner, repo)
+        sha = found.refs.get(f"refs/{ref}")
+        if sha is None:
+            return reply({"message": "Not Found"}, 404)
+        return reply({"ref": f"refs/{ref}", "object": {"type": "commit", "sha": sha}})
+
+    @app.route("/repos/<owner>/<repo>/git/refs", methods=["POST"])
+    def create_ref(owner, repo):
+        found = repo_or_404(owner, repo)
+        data = request.get_json()
+        with found.lock:
+            if data["ref"] in found.refs:
+                return reply({"message": "Reference already exists"}, 422)
+            if data["sha"] not in found.commits:
+                return reply({"message": "Object does not exist"}, 422)
+            found.refs[data["ref"]] = data["sha"]
+        return reply({"ref": data["ref"], "object": {"sha": data["sha"]}}, 201)
+
+    @app.route("/repos/<owner>/<repo>/pulls")
+    def list_pulls(owner, repo):
+        found = repo_or_404(owner, repo)
+        head = request.args.get("head")
+        state = request.args.get("state", "open")
+        return reply(
+            [
+                pull
+                for pull in found.pulls
+                if (head is None or head == f"{owner}:{pull['head']}")
+                and state in ("all", pull["state"])
+            ]
+        )
+
+    @app.route("/repos/<owner>/<repo>/pulls", methods=["POST"])
+    def create_pull(owner, repo):
+        found = repo_or_404(owner, repo)
+        data = request.get_json()
+        if f"refs/heads/{data['head']}" not in found.refs:
+            return reply({"message": "Validation Failed"}, 422)
+        with found.lock:
+            number = len(found.issues) + len(found.pulls) + 1
+            pull = dict(data, number=number, state="open")
+            pull["html_url"] = f"{request.host_url}{found.full_name}/pull/{number}"
+            found.pulls.append(pull)
+        return reply(pull, 201)
+
+    @app.route("/repos/<owner>/<repo>/issues", methods=["GET", "POST"])
+    def issues(owner, repo):
+        found = repo_or_404(owner, repo)
+        if request.method == "POST":
+            data = request.get_json()
+            with found.lock:
+                number = len(found.issues) + len(found.pulls) + 1
+                issue = dict(data, number=number, state="open")
+                issue["html_url"] = f"{request.host_url}{found.full_name}/issues/{number}"
+                found.issues.append(issue)
+            return reply(issue, 201)
+
+        state = request.args.get("state", "open")
+        labels = [label for label in request.args.get("labels", "").split(",") if label]
+        return reply(
+            [
+                issue
+                for issue in found.issues
+                if state in ("all", issue.get("state", "open"))
+                and all(label in issue.get("labels", []) for label in labels)
+            ]
+        )
+
+    @app.route("/repos/<owner>/<repo>/issues/<int:number>")
+    def issue(owner, repo, number):
+        for found in repo_or_404(owner, repo).issues:
+            if found["number"] == number:
+                return reply(found)
+        return reply({"message": "Not Found"}, 404)
+
+    ## Statistics
+
+    @app.route("/_fake/stats")
+    def stats():
+        """
+        Return the number of calls made to each API endpoint, and the pull requests and issues that
+        have been created, for checking the results of a load test.
+        """
+        with fake.lock:
+            calls = dict(fake.calls)
+        return jsonify(
+            {
+                "calls": calls,
+                "pulls": {name: len(r.pulls) for name, r in fake.repos.items()},
+                "issues": {name: len(r.issues) for name, r in fake.repos.items()},
+            }
+        )
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stand-in for GitHub for the editor to use")
+    parser.add_argument("--host", default="127.0.0.1", help="The host to listen on")
+    parser.add_argument(
+        "--port", type=int, default=5001, help="The port to listen on (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=FIXTURES,
+        help="The directory of fixture repositories to serve (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--repo",
+        action="append",
+        default=[],
+        metavar="OWNER/NAME=PATH",
+        help="Serve the repository in the given directory under the given name",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="The time, in milliseconds, taken to answer each API call (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0,
+        help="The maximum random time, in milliseconds, added to each latency (default: 0)",
+    )
+    parser.add_argument(
+        "--write-latency",
+        type=float,
+        help="The time, in milliseconds, taken to answer each API call that writes to a repository "
+        "(default: the --latency)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=5000,
+        help="The number of API calls each token may make per window (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rate-limit-window",
+        type=int,
+        default=3600,
+        help="The number of seconds after which each token's budget is reset (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--secondary-rate",
+        type=float,
+        default=0.0,
+        help="The proportion of API calls that hit the secondary rate limit (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    extra_repos = {}
+    for spec in args.repo:
+        full_name, sep, path = spec.partition("=")
+        if not sep or full_name.count("/") != 1:
+            parser.error(f"Invalid --repo: {spec}")
+        extra_repos[full_name] = path
+
+    fake = FakeGitHub(
+        load_repos(args.fixtures, extra_repos),
+        rate_limit=args.rate_limit,
+        rate_limit_window=args.rate_limit_window,
+        secondary_rate=args.secondary_rate,
+    )
+    app = create_app(
+        fake,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        write_latency=args.write_latency / 1000 if args.write_latency is not None else None,
+    )
+    print(f"Serving {', '.join(fake.repos)} on http://{args.host}:{args.port}")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
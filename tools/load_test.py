@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import requests
+
+from urllib.parse import parse_qs, urlencode, urlparse
+
+# Allow this script to be run from any directory:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import config  # noqa: E402
+
+# Load tests a running editor that is configured to use the fake GitHub in fake_github.py (see the
+# instructions there). Each of a number of simulated users logs in through the fake GitHub's OAuth
+# flow, and then repeatedly loads the index page, opens a config in the editor, validates it a few
+# times, and submits a change to it, waiting for the submission job to finish. For example:
+#
+# python3 tools/load_test.py --users 20 --duration 60 --think-time 0.5
+#
+# The throughput and latency percentiles of each route are reported, along with the number of calls
+# that the editor made to each endpoint of the fake GitHub during the test.
+
+# The repository and directory of each type of config, as in server.py:
+EDITOR_TYPES = {
+    "purl": {"repo": config.GITHUB_PURL_REPO, "dir": config.GITHUB_PURL_DIR},
+    "registry": {"repo": config.GITHUB_FOUNDRY_REPO, "dir": config.GITHUB_FOUNDRY_DIR},
+}
+
+# The response statuses that are expected from each route:
+EXPECTED = {
+    "GET /login": [302],
+    "GET /github_callback": [302],
+    "GET /": [200],
+    "GET /edit/<editor_type>/<filename>": [200],
+    "POST /validate": [200],
+    "POST /update_config": [202],
+    "GET /jobs/<job_id>": [200],
+}
+
+
+class Recorder:
+    """
+    Collects the latency of every request made during a load test, by route, along with the number
+    of requests that failed.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, route, seconds, ok):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+
+class SimulatedUser:
+    """
+    A user of the editor, with their own session, who works through the editor's workflow.
+    """
+
+    def __init__(self, number, args, recorder):
+        self.number = number
+        self.login = f"loadtest{number}"
+        self.args = args
+        self.recorder = recorder
+        self.session = requests.Session()
+        self.submissions = 0
+
+    def call(self, route, method, path, **kwargs):
+        """
+        Make a request to the editor, recording its latency under the given route.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.args.editor + path, allow_redirects=False, timeout=120, **kwargs
+            )
+        except requests.RequestException:
+            self.recorder.record(route, time.perf_counter() - start, False)
+            raise
+        self.recorder.record(
+            route, time.perf_counter() - start, response.status_code in EXPECTED[route]
+        )
+        return response
+
+    def log_in(self):
+        """
+        Log in through the fake GitHub's OAuth flow, as a browser would.
+        """
+        response = self.call("GET /login", "GET", "/login")
+        authorize = parse_qs(urlparse(response.headers["Location"]).query)
+        params = {
+            "login": self.login,
+            "redirect_uri": authorize["redirect_uri"][0],
+            "state": authorize.get("state", [""])[0],
+        }
+        grant = requests.get(
+            f"{self.args.github}/login/oauth/authorize/grant?{urlencode(params)}",
+            allow_redirects=False,
+        )
+        callback = urlparse(grant.headers["Location"])
+        self.call("GET /github_callback", "GET", f"{callback.path}?{callback.query}")
+
+    def work(self):
+        """
+        Go through the editor's workflow once: load the index, open one of the configs listed there,
+        validate it, and submit a change to it.
+        """
+        index = self.call("GET /", "GET", "/")
+        links = re.findall(r'href="/edit/(purl|registry)/([^"]+)"', index.text)
+        if not links:
+            raise Exception("No configs are listed on the index page")
+        editor_type, filename = links[(self.number + self.submissions) % len(links)]
+        self.call("GET /edit/<editor_type>/<filename>", "GET", f"/edit/{editor_type}/{filename}")
+
+        # Take the code from the fake GitHub rather than scraping it from the editor page, along
+        # with the sha of its blob, which the editor page sends with the update:
+        location = EDITOR_TYPES[editor_type]
+        raw = requests.get(
+            f"{self.args.github}/{config.GITHUB_ORG}/{location['repo']}/raw/master/"
+            f"{location['dir']}/{filename}"
+        ).content
+        base_sha = hashlib.sha1(b"blob %d\0" % len(raw) + raw).hexdigest()
+        code = raw.decode("utf-8")
+        self.submissions += 1
+        code += f"\n# Load test change {self.submissions} by {self.login}\n"
+
+        for _ in range(self.args.validations):
+            self.think()
+            self.call(
+                "POST /validate",
+                "POST",
+                "/validate",
+                data={"code": code, "editor_type": editor_type},
+            )
+
+        self.think()
+        start = time.perf_counter()
+        response = self.call(
+            "POST /update_config",
+            "POST",
+            "/update_config",
+            data={
+                "filename": filename,
+                "code": code,
+                "commit_msg": f"Load test change to {filename}",
+                "editor_type": editor_type,
+                "base_sha": base_sha,
+                "draft": "false",
+                "long_msg": "",
+            },
+        )
+        if response.status_code != 202:
+            return
+        job = response.json()
+        while job["status"] not in ("done", "failed"):
+            time.sleep(self.args.poll_interval)
+            job = self.call("GET /jobs/<job_id>", "GET", f"/jobs/{job['job_id']}").json()
+        self.recorder.record(
+            "submission (end to end)", time.perf_counter() - start, job["status"] == "done"
+        )
+
+    def think(self):
+        if self.args.think_time:
+            time.sleep(self.args.think_time)
+
+    def run(self, deadline):
+        try:
+            self.log_in()
+            if deadline is None:
+                for _ in range(self.args.iterations):
+                    self.work()
+            else:
+                while time.time() < deadline:
+                    self.work()
+        except Exception as e:
+            print(f"{self.login} stopped: {e}", file=sys.stderr)
+
+
+def percentile(times, p):
+    """
+    Return the p'th percentile of the given sorted times, interpolating between the nearest two.
+    """
+    position = (len(times) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(times) - 1)
+    return times[lower] + (times[upper] - times[lower]) * (position - lower)
+
+
+def summarise(recorder, elapsed):
+    """
+    Return a dictionary from route to its throughput and latency statistics.
+    """
+    summary = {}
+    for route, latencies in recorder.latencies.items():
+        latencies = sorted(latencies)
+        summary[route] = {
+            "requests": len(latencies),
+            "errors": recorder.errors.get(route, 0),
+            "per_sec": len(latencies) / elapsed,
+            "mean": sum(latencies) / len(latencies),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1],
+        }
+    return summary
+
+
+def fake_github_calls(github):
+    return requests.get(f"{github}/_fake/stats").json()["calls"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test an editor that uses the fake GitHub")
+    parser.add_argument(
+        "--editor",
+        default="http://localhost:5000",
+        help="The URL of the editor (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--github",
+        default="http://localhost:5001",
+        help="The URL of the fake GitHub used by the editor (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=10,
+        help="The number of simultaneous users (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=5,
+        help="The number of times each user goes through the workflow (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Go through the workflow repeatedly for this many seconds, instead of --iterations",
+    )
+    parser.add_argument(
+        "--validations",
+        type=int,
+        default=3,
+        help="The number of validations before each submission (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0,
+        help="The number of seconds that users pause between steps (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="The number of seconds between polls of a submission job (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="Also write the results, as JSON, to this file")
+    args = parser.parse_args()
+    args.editor = args.editor.rstrip("/")
+    args.github = args.github.rstrip("/")
+
+    recorder = Recorder()
+    users = [SimulatedUser(i, args, recorder) for i in range(args.users)]
+    calls_before = fake_github_calls(args.github)
+    start = time.perf_counter()
+    deadline = time.time() + args.duration if args.duration else None
+    threads = [threading.Thread(target=user.run, args=(deadline,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    calls_after = fake_github_calls(args.github)
+
+    summary = summarise(recorder, elapsed)
+    print(
+        f"{'route':<36} {'requests':>8} {'errors':>6} {'req/s':>7} {'mean ms':>8} {'p50 ms':>8} "
+        f"{'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for route, stats in summary.items():
+        print(
+            f"{route:<36} {stats['requests']:>8} {stats['errors']:>6} {stats['per_sec']:>7.2f} "
+            + " ".join(f"{stats[k] * 1000:>8.1f}" for k in ["mean", "p50", "p90", "p99", "max"])
+        )
+    print(f"\n{args.users} users in {elapsed:.1f}s. Calls made by the editor to the fake GitHub:")
+    github_calls = {
+        endpoint: n - calls_before.get(endpoint, 0)
+        for endpoint, n in sorted(calls_after.items())
+        if n > calls_before.get(endpoint, 0)
+    }
+    for endpoint, n in github_calls.items():
+        print(f"{endpoint:<60} {n:>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "users": args.users,
+                    "seconds": elapsed,
+                    "routes": summary,
+                    "github": github_calls,
+                },
+                f,
+                indent=2,
+            )
+            print(file=f)
+    return 1 if any(stats["errors"] for stats in summary.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+import uuid
+
+import requests
+
+# Allow this script to be run from any directory:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from webhooks import sign  # noqa: E402
+
+# Replays a GitHub webhook delivery against a running metadata editor, signing the payload the same
+# way that GitHub does. This is useful for testing the /github_webhook endpoint locally, e.g.:
+#
+# export GITHUB_WEBHOOK_SECRET=...
+# python3 tools/replay_webhook.py push tools/webhook_payloads/push.json
+#
+# Payloads can be copied from the "Recent Deliveries" tab of a webhook's settings on GitHub.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a GitHub webhook delivery")
+    parser.add_argument("event", help="The GitHub event type, e.g. push, issues or pull_request")
+    parser.add_argument("payload", help="A file containing the JSON payload of the delivery")
+    parser.add_argument(
+        "--url",
+        default="http://localhost:5000/github_webhook",
+        help="The URL of the webhook endpoint (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--secret",
+        default=os.getenv("GITHUB_WEBHOOK_SECRET"),
+        help="The webhook secret (default: the GITHUB_WEBHOOK_SECRET environment variable)",
+    )
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error("No webhook secret given")
+
+    with open(args.payload, "rb") as f:
+        body = f.read()
+
+    response = requests.post(
+        args.url,
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": args.event,
+            "X-GitHub-Delivery": str(uuid.uuid4()),
+            "X-Hub-Signature-256": sign(args.secret, body),
+        },
+    )
+    print(f"{response.status_code} {response.reason}")
+    if response.text:
+        print(response.text)
+    return 0 if response.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+# Allow this script to be run from any directory:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import config  # noqa: E402
+import validation  # noqa: E402
+
+from webhooks import raw_file_location  # noqa: E402
+
+# Validates every PURL and REGISTRY configuration file in local checkouts of the PURL and Foundry
+# repositories, using the same logic as the editor's /validate endpoint, in parallel across all of
+# the available cores and without any network access. For example:
+#
+# python3 tools/validate_configs.py --purl-repo ../purl.obolibrary.org \
+#     --registry-repo ../OBOFoundry.github.io --format junit --output report.xml
+#
+# The exit status is 1 if any problem at or above the --fail-on level was found, and 0 otherwise.
+
+# The location of the configuration files, and of their schemas, within each repository:
+CONFIG_LOCATIONS = {
+    "purl": {
+        "dir": config.GITHUB_PURL_DIR,
+        "ext": config.YAML_EXT,
+        "schema": raw_file_location(config.PURL_SCHEMA)[2],
+    },
+    "registry": {
+        "dir": config.GITHUB_FOUNDRY_DIR,
+        "ext": config.MARKDOWN_EXT,
+        "schema": raw_file_location(config.REGISTRY_SCHEMA)[2],
+    },
+}
+
+# The validators used by each worker process, built once per process by init_worker():
+worker_validators = {}
+
+
+def init_worker(schemas):
+    """
+    Build the validators for the given schemas (a dictionary from editor type to schema) in a
+    worker process.
+    """
+    cache = validation.ValidatorCache()
+    for editor_type, schema in schemas.items():
+        worker_validators[editor_type] = cache.get(editor_type, schema)
+
+
+def validate_file(task):
+    """
+    Validate the config file of the given type at the given path, given as an (editor_type, path)
+    tuple, and return a dictionary describing the file and the problems found in it.
+    """
+    editor_type, path = task
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as f:
+        code = f.read()
+    try:
+        results = validation.check_config(
+            editor_type, code, worker_validators[editor_type], all_errors=True
+        )
+    except validation.MalformedConfig as err:
+        results = [
+            {"result_type": "error", "summary": format(err), "line_number": -1, "details": ""}
+        ]
+    return {
+        "path": path,
+        "editor_type": editor_type,
+        "results": results,
+        "time": time.perf_counter() - start,
+    }
+
+
+def find_configs(editor_type, repo):
+    """
+    Return the paths of all of the config files of the given type in the given repository checkout.
+    """
+    location = CONFIG_LOCATIONS[editor_type]
+    return sorted(glob.glob(os.path.join(repo, location["dir"], "*" + location["ext"])))
+
+
+def load_schema(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def count_results(reports):
+    """
+    Return the number of problems of each level found in the given file reports.
+    """
+    counts = dict.fromkeys(validation.RESULT_TYPES, 0)
+    for report in reports:
+        for result in report["results"]:
+            counts[result["result_type"]] = counts.get(result["result_type"], 0) + 1
+    return counts
+
+
+def write_text(reports, elapsed, out):
+    for report in reports:
+        for result in report["results"]:
+            print(
+                f'{report["path"]}:{result["line_number"]}: {result["result_type"]}: '
+                f'{result["summary"]}',
+                file=out,
+            )
+    counts = count_results(reports)
+    print(
+        f"Validated {len(reports)} files in {elapsed:.2f}s: "
+        + ", ".join(f"{n} {level}(s)" for level, n in counts.items()),
+        file=out,
+    )
+
+
+def write_json(reports, elapsed, out):
+    json.dump(
+        {
+            "files": len(reports),
+            "seconds": round(elapsed, 3),
+            "counts": count_results(reports),
+            "reports": reports,
+        },
+        out,
+        indent=2,
+    )
+    print(file=out)
+
+
+def write_junit(reports, elapsed, out):
+    """
+    Write the given file reports as a JUnit XML report, with one test suite per config type and one
+    test case per file. Errors are reported as failures, while warnings and information are
+    included in the test case's output.
+    """
+    suites = ElementTree.Element("testsuites", time=f"{elapsed:.3f}")
+    for editor_type in CONFIG_LOCATIONS:
+        typed = [r for r in reports if r["editor_type"] == editor_type]
+        if not typed:
+            continue
+        failures = sum(1 for r in typed if any(x["result_type"] == "error" for x in r["results"]))
+        suite = ElementTree.SubElement(
+            suites,
+            "testsuite",
+            name=f"{editor_type} configs",
+            tests=str(len(typed)),
+            failures=str(failures),
+            errors="0",
+            time=f'{sum(r["time"] for r in typed):.3f}',
+        )
+        for report in typed:
+            case = ElementTree.SubElement(
+                suite,
+                "testcase",
+                classname=editor_type,
+                name=os.path.basename(report["path"]),
+                file=report["path"],
+                time=f'{report["time"]:.3f}',
+            )
+            errors = [x for x in report["results"] if x["result_type"] == "error"]
+            others = [x for x in report["results"] if x["result_type"] != "error"]
+            if errors:
+                failure = ElementTree.SubElement(
+                    case, "failure", message=errors[0]["summary"], type="error"
+                )
+                failure.text = "\n\n".join(
+                    f'Line {x["line_number"]}: {x["summary"]}\n{x["details"]}' for x in errors
+                )
+            if others:
+                output = ElementTree.SubElement(case, "system-out")
+                output.text = "\n".join(
+                    f'{x["result_type"]}: line {x["line_number"]}: {x["summary"]}' for x in others
+                )
+    ElementTree.ElementTree(suites).write(out, encoding="unicode", xml_declaration=True)
+    print(file=out)
+
+
+writers = {"text": write_text, "json": write_json, "junit": write_junit}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate all of the PURL and REGISTRY configuration files in local checkouts"
+    )
+    parser.add_argument("--purl-repo", help="A checkout of the PURL repository")
+    parser.add_argument("--registry-repo", help="A checkout of the Foundry repository")
+    parser.add_argument(
+        "--purl-schema", help="The PURL schema to use (default: the one in the PURL repository)"
+    )
+    parser.add_argument(
+        "--registry-schema",
+        help="The REGISTRY schema to use (default: the one in the Foundry repository)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="The number of processes to validate with (default: %(default)s)",
+    )
+    parser.add_argument("--format", choices=writers, default="text", help="The report format")
+    parser.add_argument("--output", help="The file to write the report to (default: stdout)")
+    parser.add_argument(
+        "--fail-on",
+        choices=validation.RESULT_TYPES,
+        default="error",
+        help="The lowest level of problem that makes validation fail (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    repos = {"purl": args.purl_repo, "registry": args.registry_repo}
+    schema_paths = {"purl": args.purl_schema, "registry": args.registry_schema}
+    if not any(repos.values()):
+        parser.error("At least one of --purl-repo and --registry-repo is required")
+
+    schemas = {}
+    tasks = []
+    for editor_type, repo in repos.items():
+        if not repo:
+            continue
+        schema_path = schema_paths[editor_type] or os.path.join(
+            repo, CONFIG_LOCATIONS[editor_type]["schema"]
+        )
+        schemas[editor_type] = load_schema(schema_path)
+        tasks += [(editor_type, path) for path in find_configs(editor_type, repo)]
+
+    start = time.perf_counter()
+    chunksize = max(1, len(tasks) // (4 * max(1, args.jobs)))
+    with ProcessPoolExecutor(
+        max_workers=args.jobs, initializer=init_worker, initargs=(schemas,)
+    ) as executor:
+        reports = list(executor.map(validate_file, tasks, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            writers[args.format](reports, elapsed, out)
+    else:
+        writers[args.format](reports, elapsed, sys.stdout)
+
+    failing = validation.RESULT_TYPES[: validation.RESULT_TYPES.index(args.fail_on) + 1]
+    counts = count_results(reports)
+    return 1 if any(counts[level] for level in failing) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import logging
+import re
+import threading
+
+import jsonschema
+import metrics
+import parsing
+
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+from ruamel.yaml.constructor import DuplicateKeyError
+from ruamel.yaml.error import YAMLError
+
+logger = logging.getLogger(__name__)
+
+# The levels of validation results, from most to least severe:
+RESULT_TYPES = ["error", "warning", "info"]
+
+
+class MalformedConfig(Exception):
+    """
+    Raised when a configuration file does not have the overall structure expected for its type,
+    and so cannot be validated at all.
+    """
+
+
+class ValidatorCache:
+    """
+    Keeps a compiled JSON schema validator for each of the schemas that configurations are
+    validated against. A validator is built, and its schema checked, only the first time that a
+    given schema object is seen. Because validators are reused, so are the `$ref`s that their
+    resolvers have already resolved. Schemas are assumed never to be modified in place; a changed
+    schema must be a new object (see metadata.MetadataSnapshot).
+    """
+
+    def __init__(self):
+        self._validators = {}
+        self._lock = threading.Lock()
+        self.compilations = 0
+
+    def get(self, name, schema):
+        """
+        Return a validator for the given schema, which is known by the given name (e.g. 'purl'),
+        building it if the schema has changed since a validator was last requested for that name.
+        """
+        cached = self._validators.get(name)
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+
+        with self._lock:
+            cached = self._validators.get(name)
+            if cached is not None and cached[0] is schema:
+                return cached[1]
+
+            # Use the validator class for the draft declared by the schema's $schema keyword:
+            cls = validator_for(schema)
+            cls.check_schema(schema)
+            validator = cls(schema, format_checker=jsonschema.FormatChecker())
+            self._validators[name] = (schema, validator)
+            self.compilations += 1
+            logger.debug(f"Compiled {cls.__name__} for the {name} schema")
+            return validator
+
+
+def unexpected_properties(err):
+    """
+    Return the properties, in the order they appear in the instance, that caused the given
+    additionalProperties validation error.
+    """
+    if not isinstance(err.instance, dict) or not isinstance(err.schema, dict):
+        return []
+    properties = err.schema.get("properties", {})
+    patterns = err.schema.get("patternProperties", {})
+    return [
+        key
+        for key in err.instance
+        if key not in properties
+        and not (isinstance(key, str) and any(re.search(p, key) for p in patterns))
+    ]
+
+
+def find_schema_error_line(err, positions):
+    """
+    Return the line number, in the YAML source, of the location of the given schema validation
+    error, or -1 if it cannot be determined. The location is looked up in the given position index
+    of the source (see parsing.position_index()); if the erroneous value itself was not indexed,
+    the line of its nearest enclosing key or item is used instead.
+    """
+    path = tuple(err.absolute_path)
+    logger.debug(f"Trying to determine line number for path {list(path)}")
+    if err.validator == "additionalProperties":
+        logger.debug("Got additional properties error")
+        # Point at the first of the unexpected properties in the source:
+        extra = [path + (key,) for key in unexpected_properties(err) if path + (key,) in positions]
+        if extra:
+            path = min(extra, key=positions.get)
+
+    while path:
+        pos = positions.get(path)
+        if pos is not None:
+            logger.debug(f"at line {pos[0] + 1}, column {pos[1] + 1}")
+            return pos[0] + 1
+        path = path[:-1]
+    return -1
+
+
+def schema_error_level(err, editor_type, yaml_source):
+    """
+    Return the level (one of RESULT_TYPES) of the given schema validation error. Violations of the
+    PURL schema are always errors. The REGISTRY schema annotates its constraints with the level of
+    their violations (which defaults to 'warning'); this level is lowered by one step for entries
+    that are marked as obsolete.
+    """
+    if editor_type == "purl":
+        return "error"
+
+    if isinstance(err.schema, dict) and "level" in err.schema:
+        result_type = err.schema["level"]
+        logger.debug(f"Got error level: {result_type}")
+    else:
+        logger.debug(f"No error level found in {err.schema}")
+        result_type = "warning"
+
+    if isinstance(yaml_source, dict) and yaml_source.get("is_obsolete"):
+        logger.debug("Demoting schema error level for obsolete registry entry")
+        if result_type == "error":
+            result_type = "warning"
+        elif result_type == "warning":
+            result_type = "info"
+    return result_type
+
+
+def schema_error_result(err, result_type, positions):
+    """
+    Return the validation result describing the given schema validation error, located using the
+    given position index of the source.
+    """
+    logger.debug(err.message)
+    error_summary = err.message
+    if err.absolute_schema_path and isinstance(err.schema, dict):
+        err_descr = err.schema.get("description")
+        if err_descr:
+            error_summary = f"{err.message} ({err_descr})"
+    return {
+        "result_type": result_type,
+        "summary": format(error_summary),
+        "line_number": find_schema_error_line(err, positions),
+        "details": format(err),
+    }
+
+
+def yaml_error_result(err):
+    """
+    Return the validation result describing the given YAML parsing error.
+    """
+    line_number = -1
+    if hasattr(err, "problem_mark"):
+        mark = err.problem_mark
+        logger.debug(f"Error has position: ({mark.line+1}:{mark.column+1})")
+        line_number = mark.line + 1
+    else:
+        logger.debug(f"Error {err} has no associated line number information.")
+    return {
+        "result_type": "error",
+        "summary": "YAML parsing error",
+        "line_number": line_number,
+        "details": format(err),
+    }
+
+
+def yaml_section(editor_type, code):
+    """
+    Return the YAML part of the given code of a configuration file of the given type. For REGISTRY
+    configuration files that is the front matter between the first two '---' lines, while PURL
+    configuration files are entirely YAML.
+    """
+    if editor_type == "purl":
+        return code
+
+    code_sections = re.split("---", code)
+    if len(code_sections) < 2:
+        logger.debug(f"Not enough sub-sections in registry config code {code}")
+        raise MalformedConfig(
+            f"Not enough sub-sections in registry config file code: {len(code_sections)}"
+        )
+    return code_sections[1]
+
+
+def check_config(editor_type, code, validator, all_errors=False):
+    """
+    Validate the given code of a configuration file of the given type using the given schema
+    validator. Returns a list of validation results, each a dictionary with the result_type (level),
+    a summary, the line number (or -1) and the details of a problem found in the code, in order of
+    line number. The list is empty if no problems were found. Unless all_errors is set, only the
+    most relevant problem is reported.
+    """
+    yaml_code = yaml_section(editor_type, code)
+    try:
+        data = parsing.load(yaml_code)
+    except (DuplicateKeyError, YAMLError, TypeError) as err:
+        return [yaml_error_result(err)]
+
+    with metrics.schema_validation_seconds.time(editor_type=editor_type):
+        if all_errors:
+            errors = list(validator.iter_errors(data))
+        else:
+            error = best_match(validator.iter_errors(data))
+            errors = [error] if error is not None else []
+    if not errors:
+        return []
+
+    # Most configurations are valid, so only parse the code a second time, with the slower loader
+    # that records where everything is, when there are problems to locate:
+    try:
+        _, positions = parsing.load_with_positions(yaml_code)
+    except (DuplicateKeyError, YAMLError, TypeError) as err:
+        logger.warning(f"Could not determine the positions of validation errors: {err}")
+        positions = {}
+
+    results = []
+    for err in errors:
+        logger.debug(
+            f"JSON validation error in {list(err.absolute_schema_path)} "
+            f":: {list(err.relative_schema_path)} "
+        )
+        result_type = schema_error_level(err, editor_type, data)
+        results.append(schema_error_result(err, result_type, positions))
+    return sorted(results, key=lambda r: r["line_number"])
+
+
+def most_severe(results):
+    """
+    Return the most severe of the given validation results. Results of an unknown level are
+    considered to be the least severe.
+    """
+
+    def severity(result):
+        result_type = result["result_type"]
+        return RESULT_TYPES.index(result_type) if result_type in RESULT_TYPES else len(RESULT_TYPES)
+
+    return min(results, key=severity)
@@ -0,0 +1,85 @@
+import hashlib
+import hmac
+import posixpath
+import re
+
+# GitHub includes at most this many commits in the payload of a push event; if a push contains more
+# commits than this we cannot know every file that it changed.
+MAX_PUSH_COMMITS = 20
+
+# The fields that the payload of each supported event must contain, each given as a path of keys:
+REQUIRED_FIELDS = {
+    "push": [["repository", "full_name"]],
+    "issues": [["repository", "full_name"], ["issue", "number"]],
+    "pull_request": [["repository", "full_name"], ["pull_request", "number"]],
+}
+
+
+def sign(secret, body):
+    """
+    Return the value of the X-Hub-Signature-256 header that GitHub would send along with a webhook
+    delivery having the given body, when configured with the given secret.
+    """
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret, body, signature):
+    """
+    Verify that the given X-Hub-Signature-256 header value is the signature of the given request
+    body, computed using the given secret.
+    """
+    if not secret or not signature:
+        return False
+    return hmac.compare_digest(sign(secret, body), signature)
+
+
+def is_well_formed(event, payload):
+    """
+    Return True if the given payload of the given event contains all of the fields required for
+    the event (see REQUIRED_FIELDS).
+    """
+    for path in REQUIRED_FIELDS.get(event, []):
+        value = payload
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                return False
+            value = value[key]
+    return True
+
+
+def pushed_files(payload):
+    """
+    Return the set of paths of the files that were added, modified or removed by the commits in
+    the given push event payload. See also is_truncated().
+    """
+    paths = set()
+    for commit in payload.get("commits") or []:
+        for change in ["added", "modified", "removed"]:
+            paths.update(commit.get(change) or [])
+    return paths
+
+
+def is_truncated(payload):
+    """
+    Return True if the given push event payload might not list every commit that was pushed.
+    """
+    return len(payload.get("commits") or []) >= MAX_PUSH_COMMITS
+
+
+def in_directory(path, directory):
+    """
+    Return True if the given file path is directly within the given directory.
+    """
+    return posixpath.dirname(path) == directory.strip("/")
+
+
+def raw_file_location(url):
+    """
+    Given the URL of a raw file on GitHub (of the form
+    https://github.com/<owner>/<repo>/raw/<branch>/<path>, on any host so as to allow for stand-ins
+    for GitHub), return a tuple containing the full name of the repository, the branch and the path
+    of the file, or None if the URL is not of that form.
+    """
+    m = re.match(r"https?://[^/]+/([^/]+/[^/]+)/raw/([^/]+)/(.+)$", url)
+    return m.groups() if m else None